@@ -2,40 +2,59 @@
 Bridge implementation for the TCP/IP Network Simulator.
 """
 
+from collections import deque
 from TCP_IP.physical.device import Device
 
+# How many recent frame identifiers a bridge remembers for loop prevention
+PROCESSED_FRAMES_LIMIT = 8192
+
 class Bridge(Device):
     """Implements a bridge that forwards frames between network segments."""
     
-    def __init__(self, name):
-        super().__init__(name)
+    def __init__(self, name, clock=None):
+        self._ports = {}  # Neighbouring endpoint -> (port index, link) it is reached through
+        super().__init__(name, clock)
         # Dictionary to store which MAC addresses are on which interface (connection index)
         self.mac_table = {}
-        # Track frames we've already processed to prevent loops
+        # Track frames we've already processed to prevent loops; the ring holds the
+        # same identifiers in arrival order so the oldest can be forgotten
         self.processed_frames = set()
+        self._processed_ring = deque(maxlen=PROCESSED_FRAMES_LIMIT)
+    
+    def _update_link_cache(self):
+        """Refresh the cached link views and the endpoint-to-port map"""
+        super()._update_link_cache()
+        ports = {}
+        for i, link in enumerate(self.connections):
+            for endpoint in (link.endpoint1, link.endpoint2):
+                # The first port that reaches an endpoint wins, as a scan of the connections would find
+                if endpoint is not None and endpoint is not self:
+                    ports.setdefault(endpoint, (i, link))
+        self._ports = ports
     
     def receive_message(self, frame, source_device):
         """Forward frames based on MAC address."""
         # Create a unique identifier for this frame to prevent processing it multiple times
-        frame_id = f"{frame.source_mac}_{frame.destination_mac}_{frame.sequence_number}"
+        frame_id = (frame.source_mac, frame.destination_mac, frame.sequence_number)
         
         # If we've already processed this frame, ignore it to prevent loops
         if frame_id in self.processed_frames:
-            self.logger.debug(f"Already processed {frame}, ignoring to prevent loops")
+            self.logger.debug("Already processed %s, ignoring to prevent loops", frame)
             return
             
-        # Add to processed frames
+        # Add to processed frames, forgetting the oldest once the ring is full
+        ring = self._processed_ring
+        if len(ring) == PROCESSED_FRAMES_LIMIT:
+            self.processed_frames.discard(ring[0])
+        ring.append(frame_id)
         self.processed_frames.add(frame_id)
         
-        self.logger.info(f"Bridge processing {frame}")
+        self.logger.info("Bridge processing %s", frame)
         
         # Learn the source MAC address
-        source_link = None
-        for i, link in enumerate(self.connections):
-            if source_device in [link.endpoint1, link.endpoint2]:
-                self.mac_table[frame.source_mac] = i
-                source_link = link
-                break
+        source_port, source_link = self._ports.get(source_device, (None, None))
+        if source_link is not None:
+            self.mac_table[frame.source_mac] = source_port
         
         # If destination is known, forward only to that port
         if frame.destination_mac in self.mac_table:
@@ -43,11 +62,11 @@ class Bridge(Device):
             target_link = self.connections[target_index]
             
             if target_link != source_link:
-                self.logger.info(f"Forwarding to known device at port {target_index}")
+                self.logger.info("Forwarding to known device at port %s", target_index)
                 target_link.transmit(frame, self)
         else:
             # Destination unknown or broadcast, flood to all ports except the source
-            self.logger.info(f"Flooding frame to all ports except source")
+            self.logger.info("Flooding frame to all ports except source")
             for link in self.connections:
                 if link != source_link:
                     link.transmit(frame, self)
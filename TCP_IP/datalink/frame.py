@@ -2,50 +2,73 @@
 Frame implementation for the TCP/IP Network Simulator.
 """
 
-import time
 import random
 from enum import Enum
+from TCP_IP.datalink.mac_address import format_mac
 
 class FrameType(Enum):
     """Enum for different frame types"""
     DATA = 1
     ACK = 2
     NAK = 3
-    ARP_REQUEST = 3
-    ARP_REPLY = 4
+    ARP_REQUEST = 4
+    ARP_REPLY = 5
 
 
 class Frame:
     """Represents a data frame at the Data Link Layer"""
     
-    def __init__(self, source_mac, destination_mac, data, sequence_number=0, frame_type=FrameType.DATA):
+    # Many frames are in flight at once, so skip the per-instance __dict__
+    __slots__ = (
+        "source_mac", "destination_mac", "data", "sequence_number", "frame_type",
+        "ack_num", "total_size", "_wire", "checksum", "_intact",
+    )
+    
+    def __init__(self, source_mac, destination_mac, data, sequence_number=0, frame_type=FrameType.DATA, checksum=None,
+                 ack_num=None, total_size=None):
         self.source_mac = source_mac
         self.destination_mac = destination_mac
         self.data = data
         self.sequence_number = sequence_number
         self.frame_type = frame_type
-        self.checksum = self._calculate_checksum()
-        self.timestamp = time.time()  # For timeout calculations
+        # Typed control fields so receivers don't have to parse them out of data
+        self.ack_num = ack_num  # Next expected sequence number carried by an ACK
+        self.total_size = total_size  # Message length carried by a SIZE frame
+        self._wire = None  # Serialized header + data, built once on first use
+        # Callers building many frames at once may pass a precomputed checksum
+        self.checksum = self._calculate_checksum() if checksum is None else checksum
+        # The checksum matches the data until introduce_error changes it
+        self._intact = True
+    
+    def serialize(self):
+        """Return the header fields and data as the bytes that go on the wire"""
+        # Cached so retransmissions, fan-out copies and repeated validity checks
+        # reuse it; introduce_error clears it when it changes the data
+        if self._wire is None:
+            data = self.data
+            # Binary payloads (ARP) go on the wire as they are; anything else is encoded as text
+            if isinstance(data, bytes):
+                self._wire = self.source_mac + self.destination_mac + str(self.sequence_number).encode() + data
+            else:
+                self._wire = self.source_mac + self.destination_mac + f"{self.sequence_number}{data}".encode()
+        return self._wire
     
     def _calculate_checksum(self):
         """Calculate a simple checksum for error detection"""
-        # Use a simple sum of bytes as checksum for demonstration
-        checksum = 0
-        # Include header fields in checksum
-        for c in str(self.source_mac) + str(self.destination_mac) + str(self.sequence_number):
-            checksum = (checksum + ord(c)) % 256
-        # Include data in checksum
-        for c in self.data:
-            checksum = (checksum + ord(c)) % 256
-        return checksum
+        # Use a simple sum of bytes as checksum for demonstration, covering the
+        # header fields and data; the builtin sum walks the bytes in C, and the
+        # modulo by 256 is taken once at the end as a mask
+        return sum(self.serialize()) & 0xFF
     
     def is_valid(self):
         """Check if the frame has a valid checksum"""
-        return self._calculate_checksum() == self.checksum
+        # Only a frame whose data was changed after construction needs re-summing
+        return self._intact or self._calculate_checksum() == self.checksum
     
     def introduce_error(self):
         """Introduce a random bit error in the frame data for testing"""
-        if len(self.data) > 0:
+        # Only text payloads are corrupted; binary (ARP) and Packet payloads pass unchanged
+        if isinstance(self.data, str) and self.data:
             char_pos = random.randint(0, len(self.data) - 1)
             char_list = list(self.data)
             # Flip a random bit in the selected character
@@ -54,8 +77,18 @@ class Frame:
             char_code ^= (1 << bit_pos)  # Flip the bit
             char_list[char_pos] = chr(char_code)
             self.data = ''.join(char_list)
+            self._wire = None
+            self._intact = False
             # Don't update checksum to simulate error
     
+    def clone(self):
+        """Return a copy of this frame with the same fields and checksum"""
+        # Copies the slots directly instead of running __init__ again
+        frame = Frame.__new__(Frame)
+        for name in Frame.__slots__:
+            setattr(frame, name, getattr(self, name))
+        return frame
+    
     def create_ack(self):
         """Create an acknowledgment frame for this frame"""
         return Frame(
@@ -63,7 +96,8 @@ class Frame:
             self.source_mac,
             f"ACK-{self.sequence_number}",
             self.sequence_number,
-            FrameType.ACK
+            FrameType.ACK,
+            ack_num=self.sequence_number
         )
     
     def create_nak(self):
@@ -78,8 +112,10 @@ class Frame:
     
     def __str__(self):
         type_str = self.frame_type.name
-        if len(self.data) > 20:
-            data_preview = self.data[:20] + "..."
+        # Packet and binary payloads are previewed through their string form
+        data = self.data if isinstance(self.data, str) else str(self.data)
+        if len(data) > 20:
+            data_preview = data[:20] + "..."
         else:
-            data_preview = self.data
-        return f"Frame[{type_str}:{self.sequence_number}] {self.source_mac[:6]}...-->{self.destination_mac[:6]}...: {data_preview}"
+            data_preview = data
+        return f"Frame[{type_str}:{self.sequence_number}] {format_mac(self.source_mac)[:6]}...-->{format_mac(self.destination_mac)[:6]}...: {data_preview}"
@@ -4,15 +4,37 @@ MAC Address implementation for the TCP/IP Network Simulator.
 
 import random
 
+# Destination address that every device on the segment accepts, in the
+# 6-byte form that frames carry
+BROADCAST_MAC = b"\xff\xff\xff\xff\xff\xff"
+
+def format_mac(mac):
+    """Return the "aa:bb:cc:dd:ee:ff" display form of a 6-byte MAC address"""
+    return mac.hex(":")
+
+def parse_mac(mac):
+    """Return the 6-byte form of a MAC address given as text or bytes; raise ValueError if malformed"""
+    if isinstance(mac, bytes):
+        packed = mac
+    else:
+        packed = bytes.fromhex(str(mac).replace(":", "").replace("-", ""))
+    if len(packed) != 6:
+        raise ValueError(f"MAC address must be 6 bytes: {mac!r}")
+    return packed
+
 class MACAddress:
     """Represents a MAC address for network devices"""
     
+    # One per device and router interface; no per-instance __dict__ needed
+    __slots__ = ("address", "packed")
+    
     def __init__(self, address=None):
         if address:
             self.address = address
         else:
             # Generate a random MAC address if none provided
             self.address = ':'.join(['{:02x}'.format(random.randint(0, 255)) for _ in range(6)])
+        self.packed = parse_mac(self.address)  # 6-byte form carried in frames
     
     def __str__(self):
         return self.address
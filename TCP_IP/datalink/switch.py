@@ -7,12 +7,14 @@ from TCP_IP.datalink.bridge import Bridge
 class Switch(Bridge):
     """Implements a switch that learns MAC addresses and forwards frames intelligently."""
     
-    def __init__(self, name):
-        super().__init__(name)
+    def __init__(self, name, clock=None):
+        super().__init__(name, clock)
         # Additional switch-specific features
         self.collision_domains = 0
         self.broadcast_domains = 1  # A switch forms a single broadcast domain
         self.vlan_table = {}  # VLAN ID -> set of ports
+        # Port -> VLAN ID, kept in step with vlan_table; a port belongs to one VLAN at a time
+        self._port_vlan = {}
     
     def update_domains(self):
         """Update the count of collision and broadcast domains."""
@@ -26,7 +28,12 @@ class Switch(Bridge):
         if vlan_id in self.vlan_table:
             self.logger.warning(f"VLAN {vlan_id} already exists, updating ports")
         
-        self.vlan_table[vlan_id] = set(ports)
+        # Ports dropped from an existing VLAN leave the reverse index too
+        for port in self.vlan_table.get(vlan_id, ()):
+            del self._port_vlan[port]
+        self.vlan_table[vlan_id] = set()
+        for port in ports:
+            self._move_port(port, vlan_id)
         self.logger.info(f"Created VLAN {vlan_id} with ports {ports}")
         
         # Update broadcast domains
@@ -38,7 +45,7 @@ class Switch(Bridge):
             self.logger.error(f"VLAN {vlan_id} does not exist")
             return False
         
-        self.vlan_table[vlan_id].add(port)
+        self._move_port(port, vlan_id)
         self.logger.info(f"Added port {port} to VLAN {vlan_id}")
         return True
     
@@ -50,11 +57,24 @@ class Switch(Bridge):
         
         if port in self.vlan_table[vlan_id]:
             self.vlan_table[vlan_id].remove(port)
+            del self._port_vlan[port]
             self.logger.info(f"Removed port {port} from VLAN {vlan_id}")
             return True
         else:
             self.logger.warning(f"Port {port} is not in VLAN {vlan_id}")
             return False
     
+    def _move_port(self, port, vlan_id):
+        """Put a port in a VLAN, taking it out of the VLAN it was in before."""
+        previous = self._port_vlan.get(port)
+        if previous is not None and previous != vlan_id:
+            self.vlan_table[previous].discard(port)
+        self.vlan_table[vlan_id].add(port)
+        self._port_vlan[port] = vlan_id
+    
+    def get_port_vlan(self, port):
+        """Return the VLAN ID of a port, or None if it is in no VLAN."""
+        return self._port_vlan.get(port)
+    
     def __str__(self):
         return f"Switch({self.name}, MAC={self.mac_address}, {len(self.connections)} ports)"
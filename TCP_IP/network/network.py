@@ -2,13 +2,16 @@
 Network implementation for the TCP/IP Network Simulator.
 """
 
+import sys
 from TCP_IP.utils.logging_config import setup_logger
 from TCP_IP.physical.device import Device
 from TCP_IP.physical.hub import Hub
 from TCP_IP.physical.link import Link
 from TCP_IP.datalink.bridge import Bridge
 from TCP_IP.datalink.switch import Switch
+from TCP_IP.datalink.mac_address import format_mac
 from TCP_IP.network.router import Router
+from TCP_IP.physical.scheduler import SimClock
 
 class Network:
     """Manages the network topology and message flow."""
@@ -21,60 +24,75 @@ class Network:
         self.switches = {} # name -> Switch
         self.routers = {}  # Add routers dictionary
         self.links = {}    # name -> Link
+        self.all_endpoints = {}  # name -> any device, hub, bridge, switch or router
+        self.mac_by_name = {}  # name -> 6-byte MAC of that endpoint, for addressing messages
         self.logger = setup_logger(f"Network_{name}", f"network_{name}")
+        # Each network runs its own simulation, so building or driving one never
+        # moves time or queues events for another
+        self.clock = SimClock()
     
     def add_device(self, name):
         """Add a new device to the network."""
-        if name in self.devices or name in self.hubs or name in self.bridges or name in self.switches:
+        if name in self.all_endpoints:
             self.logger.error(f"A device with name '{name}' already exists")
             return None
         
-        device = Device(name)
+        device = Device(name, self.clock)
         self.devices[name] = device
+        self.all_endpoints[name] = device
+        self.mac_by_name[name] = device.mac_address.packed
         self.logger.info(f"Added device: {name}")
         return device
     
     def add_hub(self, name):
         """Add a new hub to the network."""
-        if name in self.devices or name in self.hubs or name in self.bridges or name in self.switches:
+        if name in self.all_endpoints:
             self.logger.error(f"A device with name '{name}' already exists")
             return None
         
-        hub = Hub(name)
+        hub = Hub(name, self.clock)
         self.hubs[name] = hub
+        self.all_endpoints[name] = hub
+        self.mac_by_name[name] = hub.mac_address.packed
         self.logger.info(f"Added hub: {name}")
         return hub
     
     def add_bridge(self, name):
         """Add a new bridge to the network."""
-        if name in self.devices or name in self.hubs or name in self.bridges or name in self.switches:
+        if name in self.all_endpoints:
             self.logger.error(f"A device with name '{name}' already exists")
             return None
         
-        bridge = Bridge(name)
+        bridge = Bridge(name, self.clock)
         self.bridges[name] = bridge
+        self.all_endpoints[name] = bridge
+        self.mac_by_name[name] = bridge.mac_address.packed
         self.logger.info(f"Added bridge: {name}")
         return bridge
     
     def add_switch(self, name):
         """Add a new switch to the network."""
-        if name in self.devices or name in self.hubs or name in self.bridges or name in self.switches:
+        if name in self.all_endpoints:
             self.logger.error(f"A device with name '{name}' already exists")
             return None
         
-        switch = Switch(name)
+        switch = Switch(name, self.clock)
         self.switches[name] = switch
+        self.all_endpoints[name] = switch
+        self.mac_by_name[name] = switch.mac_address.packed
         self.logger.info(f"Added switch: {name}")
         return switch
     
     def add_router(self, name):
         """Add a new router to the network."""
-        if name in self.devices or name in self.hubs or name in self.bridges or name in self.switches or name in self.routers:
+        if name in self.all_endpoints:
             self.logger.error(f"A device/router with name '{name}' already exists")
             return None
         
-        router = Router(name)
+        router = Router(name, self.clock)
         self.routers[name] = router
+        self.all_endpoints[name] = router
+        self.mac_by_name[name] = router.mac_address.packed
         self.logger.info(f"Added router: {name}")
         return router
     
@@ -88,24 +106,18 @@ class Network:
         endpoint2 = None
         
         if endpoint1_name:
-            endpoint1 = (self.devices.get(endpoint1_name) or 
-                         self.hubs.get(endpoint1_name) or 
-                         self.bridges.get(endpoint1_name) or 
-                         self.switches.get(endpoint1_name))
+            endpoint1 = self.all_endpoints.get(endpoint1_name)
             if not endpoint1:
                 self.logger.error(f"Endpoint '{endpoint1_name}' not found")
                 return None
         
         if endpoint2_name:
-            endpoint2 = (self.devices.get(endpoint2_name) or 
-                         self.hubs.get(endpoint2_name) or 
-                         self.bridges.get(endpoint2_name) or 
-                         self.switches.get(endpoint2_name))
+            endpoint2 = self.all_endpoints.get(endpoint2_name)
             if not endpoint2:
                 self.logger.error(f"Endpoint '{endpoint2_name}' not found")
                 return None
         
-        link = Link(name, endpoint1, endpoint2)
+        link = Link(name, endpoint1, endpoint2, self.clock)
         self.links[name] = link
         self.logger.info(f"Added link: {name} connecting {endpoint1_name or 'None'} and {endpoint2_name or 'None'}")
         return link
@@ -133,6 +145,8 @@ class Network:
             del self.switches[name]
         elif name in self.routers:
             del self.routers[name]
+        self.all_endpoints.pop(name, None)
+        self.mac_by_name.pop(name, None)
 
         self.logger.info(f"Removed device/router: {name}")
         return True
@@ -150,6 +164,8 @@ class Network:
             link.disconnect_endpoint(hub)
         
         del self.hubs[name]
+        self.all_endpoints.pop(name, None)
+        self.mac_by_name.pop(name, None)
         self.logger.info(f"Removed hub: {name}")
         return True
     
@@ -166,6 +182,8 @@ class Network:
             link.disconnect_endpoint(bridge)
         
         del self.bridges[name]
+        self.all_endpoints.pop(name, None)
+        self.mac_by_name.pop(name, None)
         self.logger.info(f"Removed bridge: {name}")
         return True
     
@@ -182,6 +200,8 @@ class Network:
             link.disconnect_endpoint(switch)
         
         del self.switches[name]
+        self.all_endpoints.pop(name, None)
+        self.mac_by_name.pop(name, None)
         self.logger.info(f"Removed switch: {name}")
         return True
     
@@ -205,109 +225,98 @@ class Network:
     
     def send_message(self, source_name, message, target_name=None):
         """Send a message from a source device to a target device."""
-        source = (self.devices.get(source_name) or 
-                  self.hubs.get(source_name) or 
-                  self.bridges.get(source_name) or 
-                  self.switches.get(source_name))
+        source = self.all_endpoints.get(source_name)
         
         if not source:
             self.logger.error(f"Source device '{source_name}' not found")
             return False
         
-        target = None
         target_mac = None
         
         if target_name:
-            target = (self.devices.get(target_name) or 
-                      self.hubs.get(target_name) or 
-                      self.bridges.get(target_name) or 
-                      self.switches.get(target_name))
-            
-            if not target:
+            target_mac = self.mac_by_name.get(target_name)
+            if target_mac is None:
                 self.logger.error(f"Target device '{target_name}' not found")
                 return False
-            
-            target_mac = str(target.mac_address)
         
         return source.send_message(message, target_mac)
     
     def enable_go_back_n(self, device_name, window_size=4):
         """Enable Go-Back-N protocol for a device."""
-        device = (self.devices.get(device_name) or 
-                  self.hubs.get(device_name) or 
-                  self.bridges.get(device_name) or 
-                  self.switches.get(device_name))
+        device = self.all_endpoints.get(device_name)
         
         if not device:
             self.logger.error(f"Device '{device_name}' not found")
             return False
         
-        device.use_go_back_n = True
-        device.window_size = window_size
+        device.set_protocol(True, window_size)
         self.logger.info(f"Enabled Go-Back-N protocol for {device_name} with window size {window_size}")
         return True
     
     def display_network(self):
         """Display the current network topology."""
-        print(f"\n=== Network: {self.name} ===")
+        # Lines are gathered and written in one call rather than printed one by one
+        lines = [f"\n=== Network: {self.name} ===\n"]
+        add = lines.append
         
-        print("\nDevices:")
+        add("\nDevices:\n")
         for name, device in self.devices.items():
-            print(f"  {name} (MAC: {device.mac_address}, IP: {device.ip_address.address if device.ip_address else 'None'})")
+            add(f"  {name} (MAC: {device.mac_address}, IP: {device.ip_address.address if device.ip_address else 'None'})\n")
             if device.arp_table:
-                 print("    ARP Table:")
+                 add("    ARP Table:\n")
                  for ip, mac in device.arp_table.items():
-                     print(f"      {ip} -> {mac}")
+                     add(f"      {ip} -> {format_mac(mac)}\n")
         
-        print("\nRouters:")
+        add("\nRouters:\n")
         for name, router in self.routers.items():
-            print(f"  {name} (MAC: {router.mac_address})")
+            add(f"  {name} (MAC: {router.mac_address})\n")
             if router.interfaces:
-                 print("    Interfaces:")
+                 add("    Interfaces:\n")
                  for interface in router.interfaces:
-                     print(f"      {interface.name}: {interface.ip_address}, MAC: {interface.mac_address}")
+                     add(f"      {interface.name}: {interface.ip_address}, MAC: {interface.mac_address}\n")
             if router.routing_table:
-                 print("    Routing Table:")
+                 add("    Routing Table:\n")
                  # Sort routes for consistent display (optional)
                  sorted_routes = sorted(router.routing_table.items(), key=lambda item: item[0].prefixlen, reverse=True)
                  for dest, (output_int, next_hop) in sorted_routes:
-                     print(f"      {dest} -> via {output_int.name}, next hop {next_hop.address if next_hop else 'direct'}")
+                     add(f"      {dest} -> via {output_int.name}, next hop {next_hop.address if next_hop else 'direct'}\n")
             if router.arp_table:
-                 print("    ARP Table:")
+                 add("    ARP Table:\n")
                  for ip, mac in router.arp_table.items():
-                     print(f"      {ip} -> {mac}")
+                     add(f"      {ip} -> {format_mac(mac)}\n")
         
-        print("\nHubs:")
+        add("\nHubs:\n")
         for name, hub in self.hubs.items():
-            print(f"  {name} (MAC: {hub.mac_address})")
+            add(f"  {name} (MAC: {hub.mac_address})\n")
         
-        print("\nBridges:")
+        add("\nBridges:\n")
         for name, bridge in self.bridges.items():
-            print(f"  {name} (MAC: {bridge.mac_address})")
+            add(f"  {name} (MAC: {bridge.mac_address})\n")
             if bridge.mac_table:
-                print("    MAC Table:")
+                add("    MAC Table:\n")
                 for mac, port in bridge.mac_table.items():
-                    print(f"      {mac} -> Port {port}")
+                    add(f"      {format_mac(mac)} -> Port {port}\n")
         
-        print("\nSwitches:")
+        add("\nSwitches:\n")
         for name, switch in self.switches.items():
-            print(f"  {name} (MAC: {switch.mac_address})")
+            add(f"  {name} (MAC: {switch.mac_address})\n")
             if switch.mac_table:
-                print("    MAC Table:")
+                add("    MAC Table:\n")
                 for mac, port in switch.mac_table.items():
-                    print(f"      {mac} -> Port {port}")
+                    add(f"      {format_mac(mac)} -> Port {port}\n")
             if switch.vlan_table:
-                print("    VLANs:")
+                add("    VLANs:\n")
                 for vlan_id, ports in switch.vlan_table.items():
-                    print(f"      VLAN {vlan_id}: Ports {sorted(ports)}")
+                    add(f"      VLAN {vlan_id}: Ports {sorted(ports)}\n")
         
-        print("\nLinks:")
+        add("\nLinks:\n")
         for name, link in self.links.items():
             endpoint1_name = link.endpoint1.name if link.endpoint1 else "None"
             endpoint2_name = link.endpoint2.name if link.endpoint2 else "None"
-            print(f"  {name}: {endpoint1_name} <-> {endpoint2_name}")
+            add(f"  {name}: {endpoint1_name} <-> {endpoint2_name}\n")
         
-        print("\n")
+        add("\n\n")
+        sys.stdout.write("".join(lines))
     
     def __str__(self):
         return (f"Network({self.name}, {len(self.devices)} devices, {len(self.hubs)} hubs, "
@@ -315,11 +324,7 @@ class Network:
 
     def get_device(self, name):
         """Get a device (including routers, hubs, etc.) by name."""
-        return (self.devices.get(name) or
-                self.hubs.get(name) or
-                self.bridges.get(name) or
-                self.switches.get(name) or
-                self.routers.get(name))
+        return self.all_endpoints.get(name)
 
     def send_packet(self, source_name, destination_ip_str, data, protocol=0):
         """Send a packet from a source device to a target IP address."""
@@ -16,14 +16,15 @@ class Packet:
         """Calculate a simple checksum for error detection"""
         # Use a simple sum of bytes as checksum for demonstration
         checksum = 0
-        # Include header fields in checksum
+        _ord = ord  # Local lookup inside the per-character loops
+        # Include header fields in checksum; masking with 0xFF keeps the sum mod 256
         for c in str(self.source_ip) + str(self.destination_ip) + str(self.ttl) + str(self.protocol):
-            checksum = (checksum + ord(c)) % 256
+            checksum = (checksum + _ord(c)) & 0xFF
         # Include data in checksum (assuming data is string or can be converted)
         try:
             data_str = str(self.data)
             for c in data_str:
-                checksum = (checksum + ord(c)) % 256
+                checksum = (checksum + _ord(c)) & 0xFF
         except TypeError:
              # Handle cases where data is not easily convertible to string
              pass # Or implement a more robust checksum for arbitrary data
@@ -1,8 +1,9 @@
 # Add imports
+import ipaddress
 from TCP_IP.physical.device import Device
 from TCP_IP.network.ip_address import IPAddress
 from TCP_IP.network.packet import Packet # Need to create Packet class
-from TCP_IP.datalink.mac_address import MACAddress # Need MACAddress
+from TCP_IP.datalink.mac_address import MACAddress, format_mac # Need MACAddress
 from TCP_IP.utils.logging_config import setup_logger # Need setup_logger
 
 # Define a simple Interface class (can be more complex later)
@@ -20,8 +21,8 @@ class RouterInterface:
 class Router(Device):
     """Implements a router that forwards packets between networks."""
 
-    def __init__(self, name):
-        super().__init__(name)
+    def __init__(self, name, clock=None):
+        super().__init__(name, clock)
         # Routing table: {destination_network (IPAddress or str): (output_interface: RouterInterface, next_hop_ip: IPAddress or None)}
         self.routing_table = {}
         self.interfaces = []     # List of RouterInterface objects
@@ -32,9 +33,10 @@ class Router(Device):
     def add_interface(self, ip_address_str, subnet_mask_str, link):
         """Add a network interface with the given IP address, mask, and connected link."""
         new_interface = RouterInterface(ip_address_str, subnet_mask_str, link)
-        self.interfaces.append(new_interface)
         # Connect the interface's link to the router (the router is the endpoint)
+        # before recording the interface, so a full link leaves no stale interface
         link.connect_endpoint(self) # Assuming Link has connect_endpoint method
+        self.interfaces.append(new_interface)
         self.logger.info(f"Added interface {new_interface} to {self.name}")
         return new_interface
 
@@ -78,7 +80,9 @@ class Router(Device):
             self.routing_table[destination_entry] = (output_interface, next_hop_ip)
             self.logger.info(f"Added route: {destination_cidr} via {output_interface.name}, next hop {next_hop_ip_str or 'direct'}")
             return True
-        except (ipaddress.AddressValueError, ipaddress.NetmaskValueError) as e:
+        except ValueError as e:
+            # Covers AddressValueError and NetmaskValueError, and the plain ValueError
+            # ip_network raises for text that is not an address at all
             self.logger.error(f"Invalid destination CIDR {destination_cidr}: {e}")
             return False
 
@@ -94,7 +98,7 @@ class Router(Device):
             else:
                 self.logger.warning(f"Route to network {destination_cidr} not found on {self.name}")
                 return False
-        except (ipaddress.AddressValueError, ipaddress.NetmaskValueError) as e:
+        except ValueError as e:
             self.logger.error(f"Invalid destination CIDR {destination_cidr}: {e}")
             return False
 
@@ -145,12 +149,12 @@ class Router(Device):
             next_hop_mac = self.arp_lookup(target_ip_for_arp, output_interface)
 
             if next_hop_mac:
-                self.logger.info(f"Next hop IP {target_ip_for_arp} resolved to MAC {next_hop_mac}")
+                self.logger.info(f"Next hop IP {target_ip_for_arp} resolved to MAC {format_mac(next_hop_mac)}")
                 # Encapsulate the packet in a new frame and send it out the output interface
                 # Source MAC is the router's output interface MAC
                 # Destination MAC is the next hop's MAC (from ARP)
                 frame = Frame(
-                    str(output_interface.mac_address),
+                    output_interface.mac_address.packed,
                     next_hop_mac,
                     packet, # The packet is the data payload of the frame
                     sequence_number=0, # Sequence numbers for Data Link layer
@@ -211,7 +215,7 @@ class Router(Device):
     def arp_lookup(self, target_ip_str, source_interface):
         """Lookup MAC address for target_ip_str in ARP table. If not found, initiate ARP request."""
         if target_ip_str in self.arp_table:
-            self.logger.debug(f"ARP hit for {target_ip_str}: {self.arp_table[target_ip_str]}")
+            self.logger.debug(f"ARP hit for {target_ip_str}: {format_mac(self.arp_table[target_ip_str])}")
             return self.arp_table[target_ip_str]
         else:
             self.logger.info(f"ARP miss for {target_ip_str}. Initiating ARP request on {source_interface.name}")
@@ -2,61 +2,159 @@
 Device implementation for the TCP/IP Network Simulator.
 """
 
-import time
 import threading
 import random
+import math
+import heapq
+import socket
+import struct
+from collections import deque, defaultdict
 from TCP_IP.utils.logging_config import setup_logger
-from TCP_IP.datalink.mac_address import MACAddress
+from TCP_IP.datalink.mac_address import MACAddress, BROADCAST_MAC, format_mac, parse_mac
 from TCP_IP.datalink.frame import Frame, FrameType
-from TCP_IP.config import TRANSMISSION_DELAY, BIT_ERROR_RATE
+from TCP_IP.config import TRANSMISSION_DELAY, BIT_ERROR_RATE, MAX_FRAME_SIZE
 from TCP_IP.network.ip_address import IPAddress
 from TCP_IP.network.packet import Packet
+from TCP_IP.physical.scheduler import clock as shared_clock
+
+# Binary ARP payload: operation, sender MAC and sender IPv4 address, followed
+# by the 4-byte target IPv4 address
+ARP_SENDER = struct.Struct("!H6s4s")
+ARP_OP_REQUEST = 1
+ARP_OP_REPLY = 2
+ARP_PAYLOAD_SIZE = ARP_SENDER.size + 4
+
+def _decode_arp(data):
+    """Return (operation, sender_ip, sender_mac, target_ip) from an ARP payload, or None if malformed"""
+    if not isinstance(data, bytes) or len(data) != ARP_PAYLOAD_SIZE:
+        return None
+    operation, sender_mac, sender_ip = ARP_SENDER.unpack_from(data)
+    return operation, socket.inet_ntoa(sender_ip), sender_mac, socket.inet_ntoa(data[ARP_SENDER.size:])
 
 class Device:
     """Base class for all network devices."""
     
-    def __init__(self, name):
+    # Fixed attribute layout: no per-instance __dict__ for the many devices of a large network
+    __slots__ = (
+        "name", "clock", "mac_address", "mac_bytes", "mac_str", "_my_addresses", "connections", "_connections_tuple", "_single_link",
+        "logger", "ip_address", "ip_str", "default_gateway", "_arp_request_prefix", "_arp_reply_prefix",
+        "arp_table", "arp_queue", "use_go_back_n", "window_size", "next_sequence_number", "expected_sequence_number",
+        "unacknowledged_frames", "_acked_count", "_timer_armed", "timeout", "buffer", "received_messages",
+        "chunk_buffers", "chunk_lengths", "expected_message_sizes", "_ack_header_sums", "_frame_handlers",
+    )
+    
+    def __init__(self, name, clock=None):
         self.name = name
+        # Simulation clock this device's sends and timers run on; devices built
+        # outside a Network share one module-level clock
+        self.clock = shared_clock if clock is None else clock
         self.mac_address = MACAddress()
+        self.mac_bytes = self.mac_address.packed  # 6-byte form used in every frame
+        self.mac_str = str(self.mac_address)  # Cached display form
+        self._my_addresses = frozenset((self.mac_bytes, BROADCAST_MAC))  # Destinations this device accepts
         self.connections = []  # List of links connected to this device
+        self._connections_tuple = ()  # Snapshot of connections used when sending
+        self._single_link = None  # The only link, when exactly one is connected
         self.received_messages = []  # Messages received by this device
         self.logger = setup_logger(f"{self.name}", f"{self.name}")
         self.logger.info(f"Device {self.name} created with MAC {self.mac_address}")
         
         # Network Layer properties
         self.ip_address = None # Add IP address attribute
-        self.arp_table = {} # IP Address (str) -> MAC Address (str)
+        self.ip_str = None # Cached dotted-quad form of ip_address
+        self._arp_request_prefix = None # Packed ARP request sender fields, set with the IP address
+        self._arp_reply_prefix = None # Packed ARP reply sender fields, set with the IP address
+        self.arp_table = {} # IP Address (str) -> MAC Address (6 bytes)
+        self.arp_queue = {} # IP Address (str) -> packets waiting for an ARP reply
         
         # Data Link Layer properties
         self.next_sequence_number = 0
         self.expected_sequence_number = 0
         self.window_size = 4  # Window size for sliding window protocol
         self.timeout = 1.0  # Timeout in seconds for retransmission
-        self.unacknowledged_frames = {}  # sequence_number -> (frame, timestamp)
-        self.buffer = {}  # Buffer for received out-of-order frames per source MAC
-        self.use_go_back_n = False  # Default to Stop-and-Wait
+        self.unacknowledged_frames = deque()  # (sequence_number, frame, timestamp), oldest first
+        self._acked_count = 0  # Frames acknowledged so far in the current Go-Back-N send
+        self._timer_armed = False  # Whether a timeout check is scheduled for the current window
+        self.buffer = defaultdict(list)  # Heap of received out-of-order (sequence_number, frame) per source MAC
+        self.chunk_buffers = {}  # Received message chunks per source MAC, in sequence order
+        self.chunk_lengths = {}  # Characters received so far per source MAC
+        self.expected_message_sizes = {}  # Announced message length per source MAC
+        self._ack_header_sums = {}  # Checksum contribution of the fixed ACK fields per peer MAC
+        # Per-type receive handlers, looked up once per frame instead of an if/elif chain;
+        # set_protocol fills in the ACK/NAK entries for the chosen protocol
+        self._frame_handlers = {
+            FrameType.DATA: self._receive_data,
+            FrameType.ARP_REQUEST: self._receive_arp_request,
+            FrameType.ARP_REPLY: self._receive_arp_reply,
+        }
+        self.set_protocol(False)  # Default to Stop-and-Wait
         
         # Add default gateway attribute
         self.default_gateway = None
     
+    def set_protocol(self, use_go_back_n, window_size=None):
+        """Select Go-Back-N or Stop-and-Wait and specialise the ACK/NAK handlers to match"""
+        self.use_go_back_n = use_go_back_n
+        if window_size is not None:
+            self.window_size = window_size
+        # Only a Go-Back-N sender keeps a window for ACKs and NAKs to act on; the
+        # data handlers stay shared because a receiver can't tell which protocol its peer uses
+        if use_go_back_n:
+            self._frame_handlers[FrameType.ACK] = self._receive_ack
+            self._frame_handlers[FrameType.NAK] = self._receive_nak
+        else:
+            self._frame_handlers[FrameType.ACK] = self._receive_control_stop_and_wait
+            self._frame_handlers[FrameType.NAK] = self._receive_control_stop_and_wait
+    
     def connect(self, link):
         """Connect this device to a link."""
         self.connections.append(link)
+        self._update_link_cache()
         self.logger.info(f"Connected to link {link.name}")
     
     def disconnect(self, link):
         """Disconnect this device from a link."""
         if link in self.connections:
             self.connections.remove(link)
+            self._update_link_cache()
             self.logger.info(f"Disconnected from link {link.name}")
     
-    def send_message(self, message, target_mac=None):
-        """Send a message through all connected links."""
+    def _update_link_cache(self):
+        """Refresh the cached view of connections used by _broadcast"""
+        self._connections_tuple = tuple(self.connections)
+        self._single_link = self.connections[0] if len(self.connections) == 1 else None
+    
+    def _link_to(self, device):
+        """Return the connected link whose other end is device, if any"""
+        for link in self._connections_tuple:
+            if link.endpoint1 is device or link.endpoint2 is device:
+                return link
+        return self._single_link
+    
+    def _broadcast(self, frame):
+        """Transmit a frame on every connected link"""
+        # Most hosts have a single uplink, so skip the loop in that case
+        if self._single_link is not None:
+            self._single_link.transmit(frame, self)
+            return
+        for link in self._connections_tuple:
+            link.transmit(frame, self)
+    
+    def send_message(self, message, target_mac=None, drain=True):
+        """Send a message through all connected links; with drain=False the frames are only queued on the clock."""
         if not self.connections:
             self.logger.error(f"Cannot send message: No connections available")
             return False
         
-        self.logger.info(f"Sending message: {message}")
+        # The target may be given in text form
+        if target_mac:
+            try:
+                target_mac = parse_mac(target_mac)
+            except ValueError:
+                self.logger.error("Cannot send message: Invalid target MAC address %r", target_mac)
+                return False
+        
+        self.logger.info("Sending message: %s", message)
         
         # Create frames from the message
         frames = self._create_frames(message, target_mac)
@@ -65,374 +163,425 @@ class Device:
         if self.use_go_back_n:
             success = self._send_go_back_n(frames)
         else:
-            success = self._send_stop_and_wait(frames)
+            success = self._send_stop_and_wait(frames, drain)
+        
+        # Let frames still in flight (e.g. the final ACKs) reach their destinations,
+        # unless the caller is already running the clock and will deliver them itself
+        if drain:
+            self.clock.run()
         
         return success
     
     def _create_frames(self, message, target_mac):
-        """Split a message into frames, one character per frame with size information"""
-        frames = []
+        """Split a message into frames of up to MAX_FRAME_SIZE characters, after a size frame"""
         # If target_mac is None, use broadcast address
-        dest_mac = target_mac if target_mac else "FF:FF:FF:FF:FF:FF"
+        dest_mac = target_mac if target_mac else BROADCAST_MAC
+        src_mac = self.mac_bytes
+        seq0 = self.next_sequence_number
+        Frame_ = Frame
         
         # Create a special first frame with total message size
-        size_frame = Frame(
-            str(self.mac_address), 
-            dest_mac, 
-            f"__SIZE__{len(message)}", 
-            self.next_sequence_number,
-            frame_type=FrameType.DATA
-        )
-        frames.append(size_frame)
-        self.next_sequence_number += 1
+        frames = [Frame_(src_mac, dest_mac, f"__SIZE__{len(message)}", seq0, frame_type=FrameType.DATA,
+                         total_size=len(message))]
         
-        # Create a frame for each character in the message
-        for i, char in enumerate(message):
-            frame = Frame(str(self.mac_address), dest_mac, char, self.next_sequence_number)
-            frames.append(frame)
-            self.next_sequence_number += 1
+        # The MAC addresses are common to every frame, so sum them only once
+        # and add each frame's sequence number and chunk on top
+        header_sum = sum(src_mac + dest_mac)
+        chunks = [message[i:i + MAX_FRAME_SIZE] for i in range(0, len(message), MAX_FRAME_SIZE)]
+        frames += [
+            Frame_(src_mac, dest_mac, chunk, seq,
+                   checksum=(header_sum + sum(f"{seq}{chunk}".encode())) & 0xFF)
+            for seq, chunk in enumerate(chunks, seq0 + 1)
+        ]
+        self.next_sequence_number = seq0 + len(chunks) + 1
         
         return frames
     
-    def _send_stop_and_wait(self, frames):
+    def _send_stop_and_wait(self, frames, drain=True):
         """Implement Stop-and-Wait protocol for sending frames"""
+        # Without draining, each transmission is scheduled at the time it would
+        # have gone out, instead of advancing the clock between them
+        offset = 0.0
         for frame in frames:
             sent_successfully = False
             attempts = 0
+            # How many attempts time out before this frame's ACK gets through
+            failures = self._draw_ack_failures()
             
             while not sent_successfully and attempts < 3:
-                self.logger.info(f"Sending {frame}")
+                self.logger.debug("Sending %s", frame)
                 
                 # Send to all connected links
-                for link in self.connections:
-                    link.transmit(frame, self)
-                
-                # Simulate waiting for ACK
-                time.sleep(TRANSMISSION_DELAY)
+                if drain:
+                    self._broadcast(frame)
+                    # Simulate waiting for ACK by advancing the simulation clock
+                    self.clock.advance(TRANSMISSION_DELAY)
+                else:
+                    self.clock.schedule(offset, self._broadcast, frame)
+                    offset += TRANSMISSION_DELAY
                 
                 # Simulate ACK reception (in real implementation, this would be handled by actual ACK frames)
-                # For simulation purposes, we randomly decide if the frame was acknowledged
-                if random.random() > BIT_ERROR_RATE:
+                # For simulation purposes, the frame is acknowledged once its drawn failures are used up
+                if attempts >= failures:
                     sent_successfully = True
                 else:
                     attempts += 1
-                    self.logger.warning(f"Frame {frame.sequence_number} timed out, retrying ({attempts}/3)")
-                    time.sleep(TRANSMISSION_DELAY)  # Wait before retrying
+                    self.logger.warning("Frame %s timed out, retrying (%s/3)", frame.sequence_number, attempts)
+                    # Wait before retrying
+                    if drain:
+                        self.clock.advance(TRANSMISSION_DELAY)
+                    else:
+                        offset += TRANSMISSION_DELAY
             
             if not sent_successfully:
-                self.logger.error(f"Failed to send frame {frame.sequence_number} after 3 attempts")
+                self.logger.error("Failed to send frame %s after 3 attempts", frame.sequence_number)
                 return False
         
         return True
     
+    def _draw_ack_failures(self):
+        """Draw the number of lost ACKs before one succeeds, each lost with probability BIT_ERROR_RATE"""
+        # A single inverse-CDF draw from the geometric distribution replaces one
+        # random.random() per attempt: P(failures >= k) == BIT_ERROR_RATE ** k
+        if BIT_ERROR_RATE <= 0:
+            return 0
+        if BIT_ERROR_RATE >= 1:
+            return math.inf
+        return int(math.log(1.0 - random.random()) / math.log(BIT_ERROR_RATE))
+    
     def _send_go_back_n(self, frames):
         """Implement Go-Back-N protocol for sending frames with error control"""
         base = 0  # First unacknowledged frame
         next_seq_num = 0  # Next frame to send
         total_frames = len(frames)
         
-        self.logger.info(f"Using Go-Back-N protocol with window size {self.window_size} for {total_frames} frames")
+        self.logger.info("Using Go-Back-N protocol with window size %s for %s frames", self.window_size, total_frames)
         
-        # Start a timer thread to check for timeouts
+        # Timeout checks are scheduled on the simulation clock for the oldest
+        # frame's deadline; checks left over from earlier sends see their own
+        # stop event set and do nothing
         stop_timer = threading.Event()
-        timer_thread = threading.Thread(target=self._check_timeouts, args=(stop_timer,))
-        timer_thread.daemon = True
-        timer_thread.start()
+        self._timer_armed = False
+        
+        # Each send starts with an empty window, so the number of frames popped
+        # by cumulative ACKs is exactly the index of the new base
+        self.unacknowledged_frames.clear()
+        self._acked_count = 0
         
         try:
             while base < total_frames:
                 # Send frames within the window
                 while next_seq_num < base + self.window_size and next_seq_num < total_frames:
                     frame = frames[next_seq_num]
-                    self.logger.info(f"Sending {frame}")
+                    self.logger.debug("Sending %s", frame)
                     
                     # Store the frame for potential retransmission
-                    self.unacknowledged_frames[frame.sequence_number] = (frame, time.time())
+                    index = self._find_unacknowledged(frame.sequence_number)
+                    if index is None:
+                        self.unacknowledged_frames.append((frame.sequence_number, frame, self.clock.now()))
+                    else:
+                        self.unacknowledged_frames[index] = (frame.sequence_number, frame, self.clock.now())
+                    self._arm_timeout_check(stop_timer)
                     
                     # Send to all connected links
-                    for link in self.connections:
-                        link.transmit(frame, self)
+                    self._broadcast(frame)
                     
                     next_seq_num += 1
                 
-                # Wait for ACKs - in a real implementation, this would be event-driven
-                # For simulation, we'll just wait a bit
-                time.sleep(TRANSMISSION_DELAY * 2)
+                # Wait for ACKs by advancing the simulation clock
+                self.clock.advance(TRANSMISSION_DELAY * 2)
                 
-                # Check for timeouts in unacknowledged frames
-                current_time = time.time()
+                # Check for a timeout on the oldest unacknowledged frame
+                current_time = self.clock.now()
                 timeout_occurred = False
                 
-                for seq_num in list(self.unacknowledged_frames.keys()):
-                    frame, timestamp = self.unacknowledged_frames[seq_num]
+                if self.unacknowledged_frames:
+                    seq_num, _, timestamp = self.unacknowledged_frames[0]
                     if current_time - timestamp > self.timeout:
-                        self.logger.warning(f"Timeout detected for frame {seq_num}")
+                        self.logger.warning("Timeout detected for frame %s", seq_num)
                         timeout_occurred = True
-                        break
                 
                 if timeout_occurred:
                     # Reset next_seq_num to retransmit from the base
-                    self.logger.info(f"Retransmitting all frames from {base} to {next_seq_num-1}")
+                    self.logger.info("Retransmitting all frames from %s to %s", base, next_seq_num-1)
                     next_seq_num = base
                 else:
-                    # Check if base has moved (due to received ACKs)
+                    # Check if base has moved (due to received ACKs); the ACK handler
+                    # counts every frame it pops off the window
                     old_base = base
-                    while base < total_frames and frames[base].sequence_number not in self.unacknowledged_frames:
-                        base += 1
+                    base = self._acked_count
+                    # ACKs for frames still in flight after a go-back can overtake next_seq_num
+                    next_seq_num = max(next_seq_num, base)
                     
                     # Only log if base has actually moved
                     if base > old_base:
-                        self.logger.info(f"Window moved: base is now at frame {base}")
+                        self.logger.info("Window moved: base is now at frame %s", base)
             
             # All frames sent and acknowledged
-            self.logger.info(f"All {total_frames} frames sent successfully")
+            self.logger.info("All %s frames sent successfully", total_frames)
             return True
         
         finally:
-            # Stop the timer thread
+            # Stop the recurring timeout check
             stop_timer.set()
-            timer_thread.join(timeout=1.0)
+    
+    def _arm_timeout_check(self, stop_event):
+        """Schedule a timeout check for when the oldest unacknowledged frame expires"""
+        if self._timer_armed or not self.unacknowledged_frames:
+            return
+        self._timer_armed = True
+        deadline = self.unacknowledged_frames[0][2] + self.timeout
+        self.clock.schedule_at(deadline, self._check_timeouts, stop_event)
     
     def _check_timeouts(self, stop_event):
         """Check for timeouts in unacknowledged frames"""
-        while not stop_event.is_set():
-            current_time = time.time()
-            timed_out_frames = []
-            
-            # Check for timed out frames
-            for seq_num in list(self.unacknowledged_frames.keys()):
-                frame, timestamp = self.unacknowledged_frames[seq_num]
-                if current_time - timestamp > self.timeout:
-                    timed_out_frames.append(seq_num)
-            
-            # Retransmit timed out frames
-            for seq_num in timed_out_frames:
-                frame, _ = self.unacknowledged_frames[seq_num]
-                self.logger.warning(f"Frame {seq_num} timed out, retransmitting")
-                
-                # Update timestamp
-                self.unacknowledged_frames[seq_num] = (frame, current_time)
+        if stop_event.is_set():
+            return
+        self._timer_armed = False
+        
+        current_time = self.clock.now()
+        
+        # Frames are stored oldest first, so if the head of the window has
+        # not timed out then none of the others have either
+        if self.unacknowledged_frames:
+            head_seq, _, head_timestamp = self.unacknowledged_frames[0]
+            if current_time >= head_timestamp + self.timeout:
+                self.logger.warning("Frame %s timed out, retransmitting window of %s frames", head_seq, len(self.unacknowledged_frames))
                 
-                # Retransmit to all connected links
-                for link in self.connections:
-                    link.transmit(frame, self)
-            
-            # Sleep for a short time before checking again
-            time.sleep(0.1)
+                # Go back to the head: retransmit the whole window and restart its timers together.
+                # The stored frames are sent again as-is; links copy a frame before
+                # injecting an error into it, so nothing downstream mutates these objects
+                retransmit = [(seq_num, frame, current_time) for seq_num, frame, _ in self.unacknowledged_frames]
+                self.unacknowledged_frames = deque(retransmit)
+                for _, frame, _ in retransmit:
+                    self._broadcast(frame)
+        
+        # Sleep until the (possibly new) oldest frame's deadline rather than polling
+        self._arm_timeout_check(stop_event)
+    
+    def _find_unacknowledged(self, sequence_number):
+        """Return the position of a frame in the unacknowledged window, or None"""
+        # The window holds consecutive sequence numbers, so the position is an offset from the head
+        if self.unacknowledged_frames:
+            index = sequence_number - self.unacknowledged_frames[0][0]
+            if 0 <= index < len(self.unacknowledged_frames):
+                return index
+        return None
     
     def receive_message(self, frame, source_device):
         """Process a received frame"""
         # Check if the frame is addressed to this device or is a broadcast
-        if frame.destination_mac == str(self.mac_address) or frame.destination_mac == "FF:FF:FF:FF:FF:FF":
-            # Check for frame validity using checksum
-            if frame.is_valid():
-                self.logger.info(f"Received valid frame")
-                
-                # Handle different frame types
-                if frame.frame_type == FrameType.DATA:
-                    # Check if this is a size frame
-                    if frame.data.startswith("__SIZE__"):
-                        try:
-                            # Extract the total message size
-                            total_size = int(frame.data.split("__SIZE__")[1])
-                            self.logger.info(f"Message size received: {total_size} characters")
-                            
-                            # Initialize or reset the expected message size
-                            if not hasattr(self, 'expected_message_sizes'):
-                                self.expected_message_sizes = {}
-                            self.expected_message_sizes[frame.source_mac] = total_size
-                            
-                            # Send ACK for the next expected frame (not this one)
-                            next_expected = frame.sequence_number + 1
-                            ack_frame = Frame(
-                                str(self.mac_address),
-                                frame.source_mac,
-                                f"ACK-{next_expected}",  # ACK for next expected frame
-                                next_expected - 1,  # Use the current frame's sequence number
-                                FrameType.ACK
-                            )
-                            self.logger.info(f"Sending ACK {next_expected} (expecting frame {next_expected} next)")
-                            for link in self.connections:
-                                link.transmit(ack_frame, self)
-                            
-                            # Update expected sequence number
-                            self.expected_sequence_number = next_expected
-                            
-                        except (ValueError, IndexError):
-                            self.logger.error(f"Invalid SIZE frame format: {frame.data}")
-                    else:
-                        # Regular data frame
-                        if frame.sequence_number == self.expected_sequence_number:
-                            # Frame is in order
-                            self._buffer_character(frame.data, str(frame.source_mac), frame.sequence_number)
-                            
-                            # Update expected sequence number
-                            next_expected = self.expected_sequence_number + 1
-                            self.expected_sequence_number = next_expected
-                            
-                            # Send ACK for the next expected frame
-                            ack_frame = Frame(
-                                str(self.mac_address),
-                                frame.source_mac,
-                                f"ACK-{next_expected}",  # ACK for next expected frame
-                                frame.sequence_number,  # Use the current frame's sequence number
-                                FrameType.ACK
-                            )
-                            self.logger.info(f"Sending ACK {next_expected} (expecting frame {next_expected} next)")
-                            for link in self.connections:
-                                link.transmit(ack_frame, self)
-                            
-                            # Process any buffered frames that are now in order
-                            self._process_buffer()
-                            
-                            # Check if we've received all characters for this message
-                            if hasattr(self, 'expected_message_sizes') and frame.source_mac in self.expected_message_sizes:
-                                total_size = self.expected_message_sizes[frame.source_mac]
-                                if hasattr(self, 'char_buffers') and frame.source_mac in self.char_buffers:
-                                    char_buffer = self.char_buffers[frame.source_mac]
-                                    # +1 because we don't count the size frame
-                                    if len(char_buffer) >= total_size:
-                                        self.logger.info(f"All {total_size} characters received, reassembling message")
-                                        self._reassemble_message(frame.source_mac, total_size)
-                        else:
-                            # Frame is out of order
-                            self.logger.warning(f"Received out-of-order frame {frame.sequence_number}, expected {self.expected_sequence_number}")
-                            
-                            if frame.sequence_number > self.expected_sequence_number:
-                                # Buffer the frame for later processing
-                                self.buffer[frame.source_mac].append(frame)
-                                self.logger.info(f"Buffered frame {frame.sequence_number}")
-                            
-                            # Send ACK for the next expected frame (duplicate ACK)
-                            # This tells the sender to retransmit from this point
-                            ack_frame = Frame(
-                                str(self.mac_address),
-                                frame.source_mac,
-                                f"ACK-{self.expected_sequence_number}",  # Request the expected frame
-                                self.expected_sequence_number-1,
-                                FrameType.ACK
-                            )
-                            self.logger.info(f"Sending duplicate ACK {self.expected_sequence_number} (still expecting frame {self.expected_sequence_number})")
-                            for link in self.connections:
-                                link.transmit(ack_frame, self)
-                
-                elif frame.frame_type == FrameType.ACK:
-                    # Process ACK frame
-                    # Extract the next expected sequence number from the ACK data
-                    try:
-                        ack_data = frame.data.split("-")[1]
-                        next_expected = int(ack_data)
-                        self.logger.info(f"Received ACK {next_expected} (frames up to {next_expected-1} acknowledged)")
-                        
-                        # Remove all acknowledged frames from the unacknowledged list
-                        # This is the cumulative ACK behavior of Go-Back-N
-                        for seq_num in list(self.unacknowledged_frames.keys()):
-                            if seq_num < next_expected:
-                                del self.unacknowledged_frames[seq_num]
-                                self.logger.debug(f"Frame {seq_num} acknowledged")
-                    except (ValueError, IndexError):
-                        self.logger.error(f"Invalid ACK format: {frame.data}")
-                
-                elif frame.frame_type == FrameType.NAK:
-                    # Process NAK frame
-                    self.logger.warning(f"Received NAK for frame {frame.sequence_number}")
-                    if frame.sequence_number in self.unacknowledged_frames:
-                        # Retransmit the frame
-                        retransmit_frame, _ = self.unacknowledged_frames[frame.sequence_number]
-                        self.logger.info(f"Retransmitting {retransmit_frame}")
-                        for link in self.connections:
-                            link.transmit(retransmit_frame, self)
-                        # Update timestamp
-                        self.unacknowledged_frames[frame.sequence_number] = (retransmit_frame, time.time())
+        if frame.destination_mac not in self._my_addresses:
+            # Frame is not for this device
+            self.logger.debug("Ignoring frame not addressed to this device")
+            return
+        
+        # Check for frame validity using checksum
+        if not frame.is_valid():
+            # Frame is corrupted - detected by checksum
+            self.logger.warning("Received corrupted frame %s (checksum mismatch)", frame.sequence_number)
             
-            else:
-                # Frame is corrupted - detected by checksum
-                self.logger.warning(f"Received corrupted frame {frame.sequence_number} (checksum mismatch)")
-                
-                # For Go-Back-N, we don't send NAKs, we just don't ACK the corrupted frame
-                # This will cause a timeout at the sender and trigger retransmission
-                
-                # However, we can send a duplicate ACK for the last correctly received frame
-                # to speed up recovery
-                if frame.frame_type == FrameType.DATA:
-                    # Send duplicate ACK for the last correctly received frame
-                    ack_frame = Frame(
-                        str(self.mac_address),
-                        frame.source_mac,
-                        f"ACK-{self.expected_sequence_number}",  # Request the expected frame
-                        self.expected_sequence_number-1,
-                        FrameType.ACK
-                    )
-                    self.logger.info(f"Sending duplicate ACK {self.expected_sequence_number} due to corrupted frame")
-                    for link in self.connections:
-                        link.transmit(ack_frame, self)
+            # For Go-Back-N, we don't send NAKs, we just don't ACK the corrupted frame
+            # This will cause a timeout at the sender and trigger retransmission
+            
+            # However, we can send a duplicate ACK for the last correctly received frame
+            # to speed up recovery
+            if frame.frame_type == FrameType.DATA:
+                # Send duplicate ACK for the last correctly received frame
+                self.logger.info("Sending duplicate ACK %s due to corrupted frame", self.expected_sequence_number)
+                self._send_ack(frame.source_mac, self.expected_sequence_number)
+            return
+        
+        self.logger.debug("Received valid frame")
+        
+        # Hand the frame to the handler for its type
+        handler = self._frame_handlers.get(frame.frame_type)
+        if handler is not None:
+            handler(frame, source_device)
+    
+    def _receive_data(self, frame, source_device):
+        """Handle a valid DATA frame: packet, size announcement, in-order or out-of-order chunk"""
+        # Network-layer frames carry a Packet, which goes up to the network layer
+        # rather than through message chunk reassembly
+        if isinstance(frame.data, Packet):
+            self.process_packet(frame.data, source_device)
+            return
+        
+        # Check if this is a size frame
+        if frame.total_size is not None:
+            total_size = frame.total_size
+            self.logger.info("Message size received: %s characters", total_size)
+            
+            # Initialize or reset the expected message size
+            self.expected_message_sizes[frame.source_mac] = total_size
+            # A new message starts here, so drop any chunks left from an unfinished one
+            self.chunk_buffers.pop(frame.source_mac, None)
+            self.chunk_lengths.pop(frame.source_mac, None)
+            
+            # Send ACK for the next expected frame (not this one)
+            next_expected = frame.sequence_number + 1
+            self.logger.info("Sending ACK %s (expecting frame %s next)", next_expected, next_expected)
+            self._send_ack(frame.source_mac, next_expected)
+            
+            # Update expected sequence number
+            self.expected_sequence_number = next_expected
+        elif frame.sequence_number == self.expected_sequence_number:
+            # Frame is in order
+            self._buffer_chunk(frame.data, frame.source_mac, frame.sequence_number)
+            
+            # Update expected sequence number
+            next_expected = self.expected_sequence_number + 1
+            self.expected_sequence_number = next_expected
+            
+            # Send ACK for the next expected frame
+            self.logger.info("Sending ACK %s (expecting frame %s next)", next_expected, next_expected)
+            self._send_ack(frame.source_mac, next_expected)
+            
+            # Process any buffered frames that are now in order
+            self._process_buffer()
+            
+            # Check if we've received all characters for this message
+            total_size = self.expected_message_sizes.get(frame.source_mac)
+            if total_size is not None:
+                if self.chunk_lengths.get(frame.source_mac, 0) >= total_size:
+                    self.logger.info("All %s characters received, reassembling message", total_size)
+                    self._reassemble_message(frame.source_mac, total_size)
         else:
-            # Frame is not for this device
-            self.logger.debug(f"Ignoring frame not addressed to this device")
+            # Frame is out of order
+            self.logger.warning("Received out-of-order frame %s, expected %s", frame.sequence_number, self.expected_sequence_number)
+            
+            if frame.sequence_number > self.expected_sequence_number:
+                # Buffer the frame for later processing on a heap ordered by sequence number;
+                # a duplicate copy is dropped as stale once the first has been processed
+                heapq.heappush(self.buffer[frame.source_mac], (frame.sequence_number, id(frame), frame))
+                self.logger.info("Buffered frame %s", frame.sequence_number)
+            
+            # Send ACK for the next expected frame (duplicate ACK)
+            # This tells the sender to retransmit from this point
+            self.logger.info("Sending duplicate ACK %s (still expecting frame %s)", self.expected_sequence_number, self.expected_sequence_number)
+            self._send_ack(frame.source_mac, self.expected_sequence_number)
+    
+    def _receive_ack(self, frame, source_device):
+        """Handle a cumulative ACK by sliding the Go-Back-N window"""
+        # The ACK carries the next expected sequence number
+        next_expected = frame.ack_num
+        if next_expected is None:
+            self.logger.error("ACK frame carries no acknowledgment number: %s", frame.data)
+            return
+        self.logger.info("Received ACK %s (frames up to %s acknowledged)", next_expected, next_expected-1)
+        
+        # Remove all acknowledged frames from the front of the window
+        # This is the cumulative ACK behavior of Go-Back-N
+        while self.unacknowledged_frames and self.unacknowledged_frames[0][0] < next_expected:
+            seq_num, _, _ = self.unacknowledged_frames.popleft()
+            self._acked_count += 1
+            self.logger.debug("Frame %s acknowledged", seq_num)
+    
+    def _receive_nak(self, frame, source_device):
+        """Handle a NAK by retransmitting the named frame"""
+        self.logger.warning("Received NAK for frame %s", frame.sequence_number)
+        index = self._find_unacknowledged(frame.sequence_number)
+        if index is not None:
+            # Retransmit the stored frame itself; no new Frame is built on this path
+            _, retransmit_frame, _ = self.unacknowledged_frames[index]
+            self.logger.info("Retransmitting %s", retransmit_frame)
+            self._broadcast(retransmit_frame)
+            # Update timestamp
+            self.unacknowledged_frames[index] = (frame.sequence_number, retransmit_frame, self.clock.now())
+    
+    def _receive_control_stop_and_wait(self, frame, source_device):
+        """Handle an ACK or NAK while using Stop-and-Wait, which has no window to update"""
+        self.logger.debug("Received %s %s with no Go-Back-N window to update", frame.frame_type.name, frame.sequence_number)
+    
+    def _receive_arp_request(self, frame, source_device):
+        """Handle an ARP request arriving from source_device"""
+        self.handle_arp_request(frame, self._link_to(source_device))
+    
+    def _receive_arp_reply(self, frame, source_device):
+        """Handle an ARP reply arriving from source_device"""
+        self.handle_arp_reply(frame, self._link_to(source_device))
+    
+    def _send_ack(self, destination_mac, next_expected):
+        """Send a cumulative ACK asking destination_mac for frame next_expected"""
+        # The source/destination/"ACK-" part of the checksum never changes for a
+        # flow, so it is summed once per peer and only the numbers are added here
+        header_sum = self._ack_header_sums.get(destination_mac)
+        if header_sum is None:
+            header_sum = sum(self.mac_bytes + destination_mac + b"ACK-")
+            self._ack_header_sums[destination_mac] = header_sum
+        sequence_number = next_expected - 1
+        checksum = (header_sum + sum(f"{sequence_number}{next_expected}".encode())) & 0xFF
+        self._broadcast(Frame(
+            self.mac_bytes,
+            destination_mac,
+            f"ACK-{next_expected}",
+            sequence_number,
+            FrameType.ACK,
+            checksum=checksum,
+            ack_num=next_expected
+        ))
     
     def _process_buffer(self):
         """Process buffered frames that are now in order"""
-        # Sort buffer by sequence number
+        # Buffers are heaps keyed on sequence number, so only the head needs checking
         for source_mac, frames in self.buffer.items():
-            frames.sort(key=lambda f: f.sequence_number)
-            
-            # Process frames that are now in order
-            while frames and frames[0].sequence_number == self.expected_sequence_number:
-                frame = frames.pop(0)
-                self.logger.info(f"Processing buffered frame {frame.sequence_number}")
-                self.received_messages.append((frame.data, str(source_mac)))
+            # Process frames that are now in order, dropping stale ones (and duplicate
+            # copies) the sender has since retransmitted in order
+            while frames and frames[0][0] <= self.expected_sequence_number:
+                sequence_number, _, frame = heapq.heappop(frames)
+                if sequence_number < self.expected_sequence_number:
+                    continue
+                self.logger.info("Processing buffered frame %s", frame.sequence_number)
+                self._buffer_chunk(frame.data, source_mac, frame.sequence_number)
                 self.expected_sequence_number += 1
     
-    def _buffer_character(self, char, source_mac, sequence_number):
-        """Buffer a character from a received frame"""
-        # Initialize the character buffer for this source if it doesn't exist
-        if not hasattr(self, 'char_buffers'):
-            self.char_buffers = {}
-        
-        if source_mac not in self.char_buffers:
-            self.char_buffers[source_mac] = {}
-        
-        # Store the character at its sequence position
-        self.char_buffers[source_mac][sequence_number] = char
-        self.logger.debug(f"Buffered character '{char}' from {source_mac} at position {sequence_number}")
+    def _buffer_chunk(self, chunk, source_mac, sequence_number):
+        """Buffer a message chunk from a received frame"""
+        # Chunks are only buffered once they are in order, so appending keeps
+        # them in sequence and a running count tracks the message length so far
+        chunks = self.chunk_buffers.get(source_mac)
+        if chunks is None:
+            self.chunk_buffers[source_mac] = [chunk]
+            self.chunk_lengths[source_mac] = len(chunk)
+        else:
+            chunks.append(chunk)
+            self.chunk_lengths[source_mac] += len(chunk)
+        self.logger.debug("Buffered %s characters from %s at position %s", len(chunk), source_mac, sequence_number)
 
     def _reassemble_message(self, source_mac, total_size):
-        """Reassemble a complete message from buffered characters"""
-        if not hasattr(self, 'char_buffers') or source_mac not in self.char_buffers:
-            self.logger.warning(f"No character buffer found for {source_mac}")
+        """Reassemble a complete message from buffered chunks"""
+        if source_mac not in self.chunk_buffers:
+            self.logger.warning("No chunk buffer found for %s", format_mac(source_mac))
             return
         
-        # Get the character buffer for this source
-        char_buffer = self.char_buffers[source_mac]
-        
         # Check if we have all characters
-        if len(char_buffer) >= total_size:
-            # Sort by sequence number and join characters
-            # Skip the first frame (size frame) by filtering sequence numbers
-            # that are greater than the size frame's sequence number
-            size_frame_seq = min(char_buffer.keys()) - 1  # Estimate the size frame's sequence number
-            sorted_chars = [char_buffer[seq] for seq in sorted(char_buffer.keys()) if seq > size_frame_seq]
+        received = self.chunk_lengths[source_mac]
+        if received >= total_size:
+            # Chunks were buffered in sequence order, so they join straight into the message
+            message = ''.join(self.chunk_buffers[source_mac])
             
-            # Take only the first 'total_size' characters
-            sorted_chars = sorted_chars[:total_size]
-            message = ''.join(sorted_chars)
-            
-            self.logger.info(f"Reassembled message from {source_mac}: '{message}'")
-            self.received_messages.append((message, source_mac))
+            source = format_mac(source_mac)
+            self.logger.info("Reassembled message from %s: '%s'", source, message)
+            self.received_messages.append((message, source))
             
             # Clear the buffer for this source
-            self.char_buffers[source_mac] = {}
+            del self.chunk_buffers[source_mac]
+            del self.chunk_lengths[source_mac]
             
             # Clear the expected message size
-            if hasattr(self, 'expected_message_sizes') and source_mac in self.expected_message_sizes:
-                del self.expected_message_sizes[source_mac]
+            self.expected_message_sizes.pop(source_mac, None)
         else:
-            self.logger.warning(f"Incomplete message from {source_mac}: have {len(char_buffer)} of {total_size} characters")
+            self.logger.warning("Incomplete message from %s: have %s of %s characters", format_mac(source_mac), received, total_size)
     
     def assign_ip_address(self, ip_address_str, subnet_mask_str="255.255.255.0"):
         """Assign an IP address and subnet mask to the device."""
         try:
             self.ip_address = IPAddress(ip_address_str, subnet_mask_str)
+            self.ip_str = self.ip_address.address
+            # The sender part of ARP frame data only changes with the IP address
+            ip_packed = socket.inet_aton(self.ip_str)
+            self._arp_request_prefix = ARP_SENDER.pack(ARP_OP_REQUEST, self.mac_bytes, ip_packed)
+            self._arp_reply_prefix = ARP_SENDER.pack(ARP_OP_REPLY, self.mac_bytes, ip_packed)
             self.logger.info(f"Assigned IP address {self.ip_address} to {self.name}")
             return True
         except Exception as e:
@@ -448,14 +597,14 @@ class Device:
         self.logger.info(f"Received packet from {packet.source_ip} to {packet.destination_ip} on {self.name}")
 
         # Check if the packet is for this device
-        if self.ip_address and packet.destination_ip == self.ip_address.address:
+        if packet.destination_ip == self.ip_str:
             self.logger.info(f"Packet for me! Data: {packet.data}")
             # Pass data up to the next layer (Transport Layer - not implemented yet)
             self.received_messages.append((packet.data, packet.source_ip)) # Store for now
         else:
             self.logger.info(f"Packet not for me, needs routing.")
             # If this is a router, forward the packet
-            if isinstance(self, Router): # Need to import Router
+            if hasattr(self, "forward_packet"):
                  self.forward_packet(packet, source_device) # Router's forwarding logic
             else:
                  self.logger.warning(f"Device {self.name} received packet not for it, but is not a router. Dropping.")
@@ -467,13 +616,13 @@ class Device:
         self.logger.info(f"Set default gateway for {self.name} to {self.default_gateway.address}")
 
     # New method to send a packet (Network Layer initiation)
-    def send_packet(self, destination_ip_str, data, protocol=0):
-        """Create and send a network layer packet."""
+    def send_packet(self, destination_ip_str, data, protocol=0, drain=True):
+        """Create and send a network layer packet; with drain=False the clock is left for the caller to run."""
         if not self.ip_address:
             self.logger.error(f"{self.name} cannot send packet: No IP address assigned.")
             return False
 
-        packet = Packet(self.ip_address.address, destination_ip_str, data, protocol=protocol)
+        packet = Packet(self.ip_str, destination_ip_str, data, protocol=protocol)
         self.logger.info(f"{self.name} created packet: {packet}")
 
         # Determine the next hop IP
@@ -499,12 +648,12 @@ class Device:
         next_hop_mac = self.arp_lookup(next_hop_ip_str)
 
         if next_hop_mac:
-            self.logger.info(f"Next hop IP {next_hop_ip_str} resolved to MAC {next_hop_mac}")
+            self.logger.info(f"Next hop IP {next_hop_ip_str} resolved to MAC {format_mac(next_hop_mac)}")
             # Encapsulate the packet in a Data Link frame
             # Source MAC is this device's MAC
             # Destination MAC is the next hop's MAC (from ARP)
             frame = Frame(
-                str(self.mac_address),
+                self.mac_bytes,
                 next_hop_mac,
                 packet, # The packet is the data payload
                 sequence_number=self.next_sequence_number, # Use Data Link seq number
@@ -519,8 +668,9 @@ class Device:
                  self.logger.info(f"{self.name} sending frame out connected links.")
                  # Need to select the correct interface/link if multiple exist
                  # For simplicity, let's assume one connection or broadcast on all
-                 for link in self.connections:
-                     link.transmit(frame, self)
+                 self._broadcast(frame)
+                 if drain:
+                     self.clock.run()
                  return True
             else:
                  self.logger.error(f"{self.name} has no connections to send frame.")
@@ -529,6 +679,8 @@ class Device:
         else:
             self.logger.warning(f"ARP lookup failed for {next_hop_ip_str}. Cannot send packet.")
             # TODO: Queue packet and wait for ARP reply
+            if drain:
+                self.clock.run()
 
             return False
 
@@ -537,10 +689,10 @@ class Device:
     def arp_lookup(self, target_ip_str):
         """Lookup MAC address for target_ip_str in ARP table. If not found, initiate ARP request."""
         if target_ip_str in self.arp_table:
-            self.logger.debug(f"ARP hit for {target_ip_str}: {self.arp_table[target_ip_str]}")
+            self.logger.debug("ARP hit for %s: %s", target_ip_str, format_mac(self.arp_table[target_ip_str]))
             return self.arp_table[target_ip_str]
         else:
-            self.logger.info(f"ARP miss for {target_ip_str}. Initiating ARP request.")
+            self.logger.info("ARP miss for %s. Initiating ARP request.", target_ip_str)
             self.send_arp_request(target_ip_str) # Need to implement send_arp_request
             # In a real simulator, you'd queue the packet and wait for a reply.
             # For now, return None, the sending logic handles the drop/queue.
@@ -549,50 +701,46 @@ class Device:
     # Implement ARP request handling for a device (host)
     def handle_arp_request(self, frame, receiving_link):
         """Handle incoming ARP request."""
-        # Assuming ARP request data format is "ARP_REQUEST:<sender_ip>:<sender_mac>:<target_ip>"
+        # ARP fields travel packed in frame.data (see ARP_SENDER)
         try:
-            parts = frame.data.split(':')
-            if len(parts) == 4 and parts[0] == "ARP_REQUEST":
-                sender_ip = parts[1]
-                sender_mac = parts[2]
-                target_ip = parts[3]
+            arp = _decode_arp(frame.data)
+            if arp is not None and arp[0] == ARP_OP_REQUEST:
+                _, sender_ip, sender_mac, target_ip = arp
 
-                self.logger.info(f"{self.name} received ARP request for {target_ip} from {sender_ip} ({sender_mac})")
+                self.logger.info("%s received ARP request for %s from %s (%s)", self.name, target_ip, sender_ip, format_mac(sender_mac))
 
                 # Add sender to ARP table
                 self.arp_table[sender_ip] = sender_mac
-                self.logger.debug(f"Added {sender_ip} -> {sender_mac} to ARP table.")
+                self.logger.debug("Added %s -> %s to ARP table.", sender_ip, format_mac(sender_mac))
 
                 # If the target IP is this device's IP, send a reply
-                if self.ip_address and target_ip == self.ip_address.address:
-                    self.logger.info(f"ARP request is for me! Sending ARP reply to {sender_ip}")
+                if target_ip == self.ip_str:
+                    self.logger.info("ARP request is for me! Sending ARP reply to %s", sender_ip)
                     self.send_arp_reply(sender_ip, sender_mac, frame.source_mac, receiving_link) # Need to implement send_arp_reply
             else:
-                self.logger.warning(f"Received malformed ARP request frame data: {frame.data}")
+                self.logger.warning("Received malformed ARP request frame: %s", frame.data)
         except Exception as e:
-            self.logger.error(f"Error processing ARP request: {e}")
+            self.logger.error("Error processing ARP request: %s", e)
 
 
     # Implement ARP reply handling for a device (host)
     def handle_arp_reply(self, frame, receiving_link):
         """Handle incoming ARP reply."""
-        # Assuming ARP reply data format is "ARP_REPLY:<sender_ip>:<sender_mac>:<target_ip>"
+        # ARP fields travel packed in frame.data (see ARP_SENDER)
         try:
-            parts = frame.data.split(':')
-            if len(parts) == 4 and parts[0] == "ARP_REPLY":
-                sender_ip = parts[1]
-                sender_mac = parts[2]
-                target_ip = parts[3] # This should be our IP
+            arp = _decode_arp(frame.data)
+            if arp is not None and arp[0] == ARP_OP_REPLY:
+                _, sender_ip, sender_mac, target_ip = arp  # target_ip should be our IP
 
-                self.logger.info(f"{self.name} received ARP reply from {sender_ip} ({sender_mac})")
+                self.logger.info("%s received ARP reply from %s (%s)", self.name, sender_ip, format_mac(sender_mac))
 
                 # Add sender to ARP table
                 self.arp_table[sender_ip] = sender_mac
-                self.logger.debug(f"Added {sender_ip} -> {sender_mac} to ARP table.")
+                self.logger.debug("Added %s -> %s to ARP table.", sender_ip, format_mac(sender_mac))
 
                 # Check if there are queued packets for this IP and send them
                 if sender_ip in self.arp_queue:
-                    self.logger.info(f"Sending {len(self.arp_queue[sender_ip])} queued packets for {sender_ip}")
+                    self.logger.info("Sending %s queued packets for %s", len(self.arp_queue[sender_ip]), sender_ip)
                     queued_packets = self.arp_queue.pop(sender_ip) # Get and remove the queue
                     for packet in queued_packets:
                         # Now that we have the MAC, send the packet
@@ -602,7 +750,7 @@ class Device:
                              # Source MAC is this device's MAC
                              # Destination MAC is the next hop's MAC (from ARP)
                              frame_to_send = Frame(
-                                 str(self.mac_address),
+                                 self.mac_bytes,
                                  next_hop_mac,
                                  packet, # The packet is the data payload
                                  sequence_number=self.next_sequence_number, # Use Data Link seq number
@@ -613,57 +761,62 @@ class Device:
                              # Send the frame out the appropriate link
                              # This is simplified - ideally, you'd send out the link connected to the next hop.
                              # For now, sending out the link where the ARP reply was received is a reasonable proxy.
-                             self.logger.info(f"{self.name} sending queued packet for {sender_ip} out {receiving_link.name}")
+                             self.logger.info("%s sending queued packet for %s out %s", self.name, sender_ip, receiving_link.name)
                              receiving_link.transmit(frame_to_send, self)
                         else:
-                             self.logger.error(f"ARP entry for {sender_ip} disappeared after receiving reply. Cannot send queued packet.")
+                             self.logger.error("ARP entry for %s disappeared after receiving reply. Cannot send queued packet.", sender_ip)
 
 
             else:
-                self.logger.warning(f"Received malformed ARP reply frame data: {frame.data}")
+                self.logger.warning("Received malformed ARP reply frame: %s", frame.data)
         except Exception as e:
-            self.logger.error(f"Error processing ARP reply: {e}")
+            self.logger.error("Error processing ARP reply: %s", e)
 
 
     # Implement sending ARP request for a device (host)
     def send_arp_request(self, target_ip_str):
         """Send an ARP request for target_ip_str."""
         if not self.ip_address:
-            self.logger.error(f"{self.name} cannot send ARP request: No IP address assigned.")
+            self.logger.error("%s cannot send ARP request: No IP address assigned.", self.name)
+            return
+
+        try:
+            target_ip_packed = socket.inet_aton(target_ip_str)
+        except OSError:
+            self.logger.error("%s cannot send ARP request: invalid IP address %s", self.name, target_ip_str)
             return
 
         # ARP request is broadcast at the Data Link layer
-        arp_frame_data = f"ARP_REQUEST:{self.ip_address.address}:{self.mac_address}:{target_ip_str}"
+        arp_frame_data = self._arp_request_prefix + target_ip_packed
         arp_frame = Frame(
-            str(self.mac_address),
-            "FF:FF:FF:FF:FF:FF", # Broadcast MAC address
+            self.mac_bytes,
+            BROADCAST_MAC,
             arp_frame_data,
             sequence_number=0, # ARP frames don't need sequence numbers for this sim
             frame_type=FrameType.ARP_REQUEST
         )
 
-        self.logger.info(f"{self.name} sending ARP request for {target_ip_str}")
+        self.logger.info("%s sending ARP request for %s", self.name, target_ip_str)
         # Send out all connected links (assuming they are on the same broadcast domain)
-        for link in self.connections:
-            link.transmit(arp_frame, self)
+        self._broadcast(arp_frame)
 
     # Implement sending ARP reply for a device (host)
-    def send_arp_reply(self, target_ip_str, target_mac_str, destination_mac_str, source_link):
+    def send_arp_reply(self, target_ip_str, target_mac, destination_mac, source_link):
         """Send an ARP reply to target_ip_str (who sent the request)."""
         if not self.ip_address:
-            self.logger.error(f"{self.name} cannot send ARP reply: No IP address assigned.")
+            self.logger.error("%s cannot send ARP reply: No IP address assigned.", self.name)
             return
 
         # ARP reply is unicast to the requester's MAC address
-        arp_frame_data = f"ARP_REPLY:{self.ip_address.address}:{self.mac_address}:{target_ip_str}"
+        arp_frame_data = self._arp_reply_prefix + socket.inet_aton(target_ip_str)
         arp_frame = Frame(
-            str(self.mac_address),
-            destination_mac_str, # Send directly back to the requester's MAC
+            self.mac_bytes,
+            destination_mac, # Send directly back to the requester's MAC
             arp_frame_data,
             sequence_number=0,
             frame_type=FrameType.ARP_REPLY
         )
 
-        self.logger.info(f"{self.name} sending ARP reply to {target_ip_str} ({destination_mac_str})")
+        self.logger.info("%s sending ARP reply to %s (%s)", self.name, target_ip_str, format_mac(destination_mac))
         # Send out the link where the request was received
         source_link.transmit(arp_frame, self)
@@ -7,17 +7,33 @@ from TCP_IP.physical.device import Device
 class Hub(Device):
     """Implements a basic hub that broadcasts data to all connected devices."""
     
-    def __init__(self, name):
-        super().__init__(name)
+    __slots__ = ("_outbound",)
+    
+    def __init__(self, name, clock=None):
+        self._outbound = {}  # Source device -> links a frame from it is repeated on
+        super().__init__(name, clock)
+    
+    def _update_link_cache(self):
+        """Refresh the cached link views, dropping the per-source outbound links"""
+        super()._update_link_cache()
+        self._outbound.clear()
+    
+    def _outbound_for(self, source_device):
+        """Return the links a frame arriving from source_device is repeated on"""
+        links = self._outbound.get(source_device)
+        if links is None:
+            links = tuple(link for link in self._connections_tuple if not link.has_endpoint(source_device))
+            self._outbound[source_device] = links
+        return links
     
     def receive_message(self, frame, source_device):
         """Receive a message from a link and broadcast it to all other links."""
-        self.logger.info(f"Hub broadcasting: {frame}")
+        self.logger.info("Hub broadcasting: %s", frame)
         
-        # Broadcast to all connections except the source
-        for link in self.connections:
-            if source_device not in [link.endpoint1, link.endpoint2]:
-                link.transmit(frame, self)
+        # Repeat the frame on every other port. It already went through CSMA/CD
+        # on the way in, so each port forwards it directly instead of contending again
+        for link in self._outbound_for(source_device):
+            link.forward(frame, self)
     
     def __str__(self):
         return f"Hub({self.name}, MAC={self.mac_address})"
@@ -2,35 +2,57 @@
 Link implementation for the TCP/IP Network Simulator.
 """
 
-import time
+import logging
+import math
 import random
-import threading
 from TCP_IP.utils.logging_config import setup_logger
-from TCP_IP.datalink.frame import Frame, FrameType
-from TCP_IP.config import ERROR_INJECTION_RATE, BUSY_TIME_RANGE
+from TCP_IP.datalink.frame import FrameType
+from TCP_IP.config import ERROR_INJECTION_RATE, BUSY_TIME_RANGE, TRANSMISSION_DELAY
+from TCP_IP.physical.scheduler import clock as shared_clock
+from TCP_IP.utils.rwlock import RWLock
+
+LOG_BUSY_CHANCE = math.log(0.2)  # Chance that a carrier sense finds the demo medium busy
+
+# Codes for the per-attempt CSMA/CD events gathered by Link._contend
+EVENT_BUSY, EVENT_TRANSMIT, EVENT_BACKOFF = range(3)
+EVENT_FORMATS = (
+    "medium busy (%s attempts)",
+    "transmitting to %s",
+    "backing off for %.3fs after collision",
+)
 
 class Link:
     """Represents a connection between network devices."""
     
-    def __init__(self, name, endpoint1=None, endpoint2=None):
+    __slots__ = (
+        "name", "clock", "endpoint1", "endpoint2", "logger", "_endpoints_set", "_dest_for", "medium_busy", "busy_until",
+        "collision_detected", "_tx_count", "_tx_ends", "transmission_lock",
+    )
+    
+    def __init__(self, name, endpoint1=None, endpoint2=None, clock=None):
         self.name = name
+        self.clock = shared_clock if clock is None else clock  # Simulation clock deliveries are scheduled on
         self.endpoint1 = endpoint1
         self.endpoint2 = endpoint2
         self.logger = setup_logger(f"Link_{name}", f"link_{name}")
+        self._endpoints_changed()
         
         # CSMA/CD properties
         self.medium_busy = False
         self.busy_until = 0  # Time when medium will become free
         self.collision_detected = False
-        self.transmitting_devices = set()  # Track devices currently transmitting
-        self.transmission_lock = threading.Lock()  # Lock for synchronizing access to medium
+        # Only the number of transmitters is ever consulted, so it is kept as a count,
+        # with one flag per end so a device is counted once however often it starts
+        self._tx_count = 0
+        self._tx_ends = [False, False]  # Whether endpoint1 / endpoint2 is transmitting
+        self.transmission_lock = RWLock()  # Carrier sense reads in parallel; state changes are exclusive
         
         # Randomly make the medium busy initially (only 10% chance)
         if random.random() < 0.1:
             busy_duration = random.uniform(0.05, 0.15)
             self.medium_busy = True
-            self.busy_until = time.time() + busy_duration
-            self.logger.info(f"Medium initially busy for {busy_duration:.3f} seconds")
+            self.busy_until = self.clock.now() + busy_duration
+            self.logger.info("Medium initially busy for %.3f seconds", busy_duration)
         
         if endpoint1:
             endpoint1.connect(self)
@@ -39,155 +61,255 @@ class Link:
     
     def is_medium_busy(self):
         """Check if the medium is busy (carrier sense)"""
-        with self.transmission_lock:
-            current_time = time.time()
-            # Check if the busy time has expired
-            if self.medium_busy and current_time > self.busy_until:
-                self.medium_busy = False
-                self.logger.info(f"Medium is now free (busy time expired)")
-            return self.medium_busy
+        now = self.clock.now()
+        # Read-only check so concurrent carrier senses don't serialise; an expired
+        # busy period is cleared the next time a writer looks at the medium
+        with self.transmission_lock.reader():
+            return self.medium_busy and now <= self.busy_until
+    
+    def _medium_busy_at(self, now):
+        """Carrier sense at time now; the caller holds transmission_lock as writer"""
+        # Check if the busy time has expired
+        if self.medium_busy and now > self.busy_until:
+            self.medium_busy = False
+            self.logger.debug("Medium is now free (busy time expired)")
+        return self.medium_busy
     
     def start_transmission(self, device):
         """Start transmission from a device (returns True if successful, False if collision)"""
-        with self.transmission_lock:
+        end = self._end_of(device)
+        if end is None:
+            return False
+        now = self.clock.now()
+        # Double-checked carrier sense: a medium that is visibly busy is rejected
+        # without taking the lock; only an apparently free medium is re-checked under it
+        if self.medium_busy and now <= self.busy_until:
+            self.logger.debug("%s sensed medium busy, will be busy for %.3f more seconds", device.name, self.busy_until - now)
+            return False
+        
+        with self.transmission_lock.writer():
             # Check if medium is busy (carrier sense)
-            if self.is_medium_busy():
-                busy_for = max(0, self.busy_until - time.time())
-                self.logger.info(f"{device.name} sensed medium busy, will be busy for {busy_for:.3f} more seconds")
+            if self._medium_busy_at(now):
+                busy_for = max(0, self.busy_until - now)
+                self.logger.debug("%s sensed medium busy, will be busy for %.3f more seconds", device.name, busy_for)
                 return False
             
             # Medium is free, start transmitting
             # Set medium busy for a short duration (just for this transmission)
             transmission_duration = random.uniform(0.02, 0.05)  # Shorter duration to avoid getting stuck
             self.medium_busy = True
-            self.busy_until = time.time() + transmission_duration
-            self.transmitting_devices.add(device)
-            self.logger.info(f"{device.name} started transmission, medium is busy for {transmission_duration:.3f} seconds")
+            self.busy_until = now + transmission_duration
+            if not self._tx_ends[end]:
+                self._tx_ends[end] = True
+                self._tx_count += 1
+            self.logger.debug("%s started transmission, medium is busy for %.3f seconds", device.name, transmission_duration)
             
             # Check for collision (if another device is already transmitting)
-            if len(self.transmitting_devices) > 1:
+            if self._tx_count > 1:
                 self.collision_detected = True
-                self.logger.warning(f"Collision detected! {len(self.transmitting_devices)} devices transmitting")
+                self.logger.warning("Collision detected! %s devices transmitting", self._tx_count)
                 return False
             
             return True
     
     def end_transmission(self, device):
         """End transmission from a device"""
-        with self.transmission_lock:
-            if device in self.transmitting_devices:
-                self.transmitting_devices.remove(device)
-                self.logger.info(f"{device.name} ended transmission")
+        end = self._end_of(device)
+        if end is None:
+            return
+        now = self.clock.now()
+        with self.transmission_lock.writer():
+            if self._tx_ends[end]:
+                self._tx_ends[end] = False
+                self._tx_count -= 1
+                self.logger.debug("%s ended transmission", device.name)
             
             # Reset collision flag if no devices are transmitting
-            if len(self.transmitting_devices) == 0:
+            if not self._tx_count:
                 self.collision_detected = False
                 
                 # Set a very short cooldown period
                 cooldown = 0.005  # Very short cooldown to avoid getting stuck
-                self.busy_until = time.time() + cooldown
-                self.logger.info(f"Medium will be free in {cooldown:.3f} seconds")
+                self.busy_until = now + cooldown
+                self.logger.debug("Medium will be free in %.3f seconds", cooldown)
+    
+    def _end_of(self, device):
+        """Return the index of device's end in _tx_ends, or None (logged) if it is not attached"""
+        if device is self.endpoint1:
+            return 0
+        if device is self.endpoint2:
+            return 1
+        self.logger.error("Error: %s is not connected to this link", device.name)
+        return None
     
     def connect_endpoint(self, endpoint, position=None):
         """Connect an endpoint (device or hub) to this link."""
         if position == 1 or (position is None and self.endpoint1 is None):
             self.endpoint1 = endpoint
+            self._endpoints_changed()
             endpoint.connect(self)
-            self.logger.info(f"Connected {endpoint.name} as endpoint1")
+            self.logger.info("Connected %s as endpoint1", endpoint.name)
         elif position == 2 or (position is None and self.endpoint2 is None):
             self.endpoint2 = endpoint
+            self._endpoints_changed()
             endpoint.connect(self)
-            self.logger.info(f"Connected {endpoint.name} as endpoint2")
+            self.logger.info("Connected %s as endpoint2", endpoint.name)
         else:
             raise ValueError("Link already has two endpoints connected")
     
+    def _endpoints_changed(self):
+        """Refresh the endpoint set and destination map after an endpoint changes"""
+        self._endpoints_set = frozenset(e for e in (self.endpoint1, self.endpoint2) if e is not None)
+        # Each connected endpoint maps to the one opposite it (None if unconnected)
+        self._dest_for = {e: other for e, other in ((self.endpoint1, self.endpoint2), (self.endpoint2, self.endpoint1))
+                          if e is not None}
+        # Endpoints cache views of their links (a hub caches where each source's frames go)
+        for endpoint in self._endpoints_set:
+            endpoint._update_link_cache()
+    
+    def has_endpoint(self, device):
+        """Return True if device is connected to either end of this link"""
+        return device in self._endpoints_set
+    
     def disconnect_endpoint(self, endpoint):
         """Disconnect an endpoint from this link."""
         if self.endpoint1 == endpoint:
             self.endpoint1.disconnect(self)
             self.endpoint1 = None
-            self.logger.info(f"Disconnected {endpoint.name} from endpoint1")
+            self._endpoints_changed()
+            self.logger.info("Disconnected %s from endpoint1", endpoint.name)
         elif self.endpoint2 == endpoint:
             self.endpoint2.disconnect(self)
             self.endpoint2 = None
-            self.logger.info(f"Disconnected {endpoint.name} from endpoint2")
+            self._endpoints_changed()
+            self.logger.info("Disconnected %s from endpoint2", endpoint.name)
     
     def transmit(self, frame, source):
         """Transmit a frame from source to the other endpoint with CSMA/CD."""
-        if source not in [self.endpoint1, self.endpoint2]:
-            self.logger.error(f"Error: Source {source.name} not connected to this link")
+        destination = self._destination_for(source)
+        if destination is None:
             return False
         
-        # Determine the destination
-        destination = self.endpoint2 if source == self.endpoint1 else self.endpoint1
+        start_time = max(self.clock.now(), self.busy_until)
+        sent, elapsed = self._contend(frame, source, destination.name)
+        if not sent:
+            self.busy_until = start_time + elapsed
+            return False
         
+        self._deliver(frame, source, destination, start_time + elapsed)
+        return True
+    
+    def forward(self, frame, source):
+        """Put a frame relayed by source straight onto this link, without contention."""
+        # Used for the hub-to-device leg: the frame already won the shared medium
+        # on its way into the hub, and each hub port is point-to-point
+        destination = self._destination_for(source)
         if destination is None:
-            self.logger.error(f"Error: No destination connected")
             return False
-        
-        # Create a copy of the frame to avoid modifying the original
-        transmitted_frame = Frame(
-            frame.source_mac,
-            frame.destination_mac,
-            frame.data,
-            frame.sequence_number,
-            frame.frame_type
-        )
-        
-        # Simplified CSMA/CD implementation to avoid getting stuck
+        self._deliver(frame, source, destination, max(self.clock.now(), self.busy_until))
+        return True
+    
+    def _destination_for(self, source):
+        """Return the endpoint opposite source, logging why if there is none"""
+        destination = self._dest_for.get(source)
+        if destination is None:
+            if source in self._endpoints_set:
+                self.logger.error("Error: No destination connected")
+            else:
+                self.logger.error("Error: Source %s not connected to this link", source.name)
+        return destination
+    
+    def _contend(self, frame, source, destination_name):
+        """Run the CSMA/CD attempts for a frame; return (sent, simulated time taken)"""
+        # Simplified CSMA/CD implementation to avoid getting stuck. Waiting,
+        # transmitting and backing off take simulated time rather than sleeping:
+        # the attempt starts once the medium is free and its duration is added up
+        # as it goes, so frames on this link still arrive in the order they were sent
+        # Per-attempt carrier sense and backoff steps are gathered as
+        # (simulated time, event code, args) and written as one DEBUG record per
+        # frame; at the default INFO level nothing is gathered at all
+        events = [] if self.logger.isEnabledFor(logging.DEBUG) else None
         attempts = 0
         max_attempts = 5  # Reduced to avoid long waits
+        elapsed = 0.0
+        rand = random.random  # Looked up once; every draw below comes from the shared, seedable generator
         
         while attempts < max_attempts:
-            # Randomly make the medium busy to demonstrate CSMA/CD (only 20% chance)
-            if random.random() < 0.2:
-                self.logger.info(f"Medium is busy when {source.name} tries to send frame {frame.sequence_number}")
-                # Wait a short time and try again
-                time.sleep(0.05)
-                attempts += 1
-                continue
+            # Randomly make the medium busy to demonstrate CSMA/CD (20% chance per
+            # sense). The run of busy senses before the medium is found free is
+            # drawn once from its geometric distribution instead of one roll each
+            busy_senses = int(math.log(1.0 - rand()) / LOG_BUSY_CHANCE)
+            if busy_senses:
+                busy_senses = min(busy_senses, max_attempts - attempts)
+                if events is not None:
+                    events.append((elapsed, EVENT_BUSY, (busy_senses,)))
+                # Wait a short time per busy sense and try again
+                elapsed += 0.05 * busy_senses
+                attempts += busy_senses
+                if attempts >= max_attempts:
+                    break
             
             # Medium is free, proceed with transmission
-            self.logger.info(f"{source.name} transmitting frame {frame.sequence_number} to {destination.name}")
+            if events is not None:
+                events.append((elapsed, EVENT_TRANSMIT, (destination_name,)))
             
             # Simulate transmission delay
-            time.sleep(0.02)
+            elapsed += 0.02
             
             # Small chance of collision (10%)
-            if random.random() < 0.1:
-                self.logger.warning(f"Collision detected during {source.name}'s transmission of frame {frame.sequence_number}")
-                # Apply backoff
-                backoff_time = random.uniform(0.01, 0.05) * (attempts + 1)
-                self.logger.info(f"{source.name} backing off for {backoff_time:.3f}s after collision")
-                time.sleep(backoff_time)
+            if rand() < 0.1:
+                self.logger.warning("Collision detected during %s's transmission of frame %s", source.name, frame.sequence_number)
+                # Apply backoff, uniform in [0.01, 0.05) per attempt
+                backoff_time = (0.01 + 0.04 * rand()) * (attempts + 1)
+                if events is not None:
+                    events.append((elapsed, EVENT_BACKOFF, (backoff_time,)))
+                elapsed += backoff_time
                 attempts += 1
                 continue
             
-            # Small chance of corruption (based on ERROR_INJECTION_RATE)
-            if random.random() < ERROR_INJECTION_RATE and frame.frame_type == FrameType.DATA:
-                self.logger.warning(f"Error introduced in frame {frame.sequence_number}")
-                # Introduce error
-                transmitted_frame.introduce_error()
-            
-            # Successful transmission
-            self.logger.info(f"Frame {frame.sequence_number} successfully transmitted from {source.name} to {destination.name}")
-            
-            # Deliver the frame to the destination
-            destination.receive_message(transmitted_frame, source)
-            return True
+            self._log_events(events, frame, source)
+            return True, elapsed
         
         # Max attempts reached
-        self.logger.error(f"{source.name} exceeded maximum transmission attempts ({max_attempts}) for frame {frame.sequence_number}")
-        return False
+        self._log_events(events, frame, source)
+        self.logger.error("%s exceeded maximum transmission attempts (%s) for frame %s", source.name, max_attempts, frame.sequence_number)
+        return False, elapsed
+    
+    def _log_events(self, events, frame, source):
+        """Write the CSMA/CD events gathered for one frame as a single DEBUG record"""
+        if events:
+            self.logger.debug("%s CSMA/CD steps for frame %s:\n%s", source.name, frame.sequence_number,
+                              "\n".join(f"  +{t:.3f}s " + EVENT_FORMATS[code] % args for t, code, args in events))
+    
+    def _deliver(self, frame, source, destination, sent_time):
+        """Put a frame on this link and schedule its arrival at destination"""
+        # Frames are only copied when an error is about to be injected
+        # (copy-on-write); otherwise the receiver gets the sender's frame itself,
+        # which nothing downstream modifies
+        transmitted_frame = frame
+        if frame.frame_type == FrameType.DATA and random.random() < ERROR_INJECTION_RATE:
+            # The copy carries the sender's checksum, so the flipped bit is detected
+            transmitted_frame = frame.clone()
+            self.logger.warning("Error introduced in frame %s", frame.sequence_number)
+            # Introduce error
+            transmitted_frame.introduce_error()
+        
+        # Successful transmission
+        self.logger.info("Frame %s successfully transmitted from %s to %s", frame.sequence_number, source.name, destination.name)
+        
+        # The medium is occupied until this frame is on the wire; schedule
+        # its delivery to the destination after the propagation delay
+        self.busy_until = sent_time
+        self.clock.schedule_at(sent_time + TRANSMISSION_DELAY, destination.receive_message, transmitted_frame, source)
     
     def detect_collision(self, device):
         """Check if a collision has occurred during transmission"""
-        with self.transmission_lock:
+        with self.transmission_lock.writer():
             # A collision occurs if more than one device is transmitting
-            collision = len(self.transmitting_devices) > 1
+            collision = self._tx_count > 1
             if collision and not self.collision_detected:
                 self.collision_detected = True
-                self.logger.warning(f"Collision detected during {device.name}'s transmission!")
+                self.logger.warning("Collision detected during %s's transmission!", device.name)
             return collision
     
     def __str__(self):
@@ -0,0 +1,79 @@
+"""
+Discrete-event scheduler for the TCP/IP Network Simulator.
+"""
+
+import heapq
+import itertools
+import threading
+from TCP_IP.utils.logging_config import setup_logger
+
+class SimClock:
+    """Virtual simulation clock backed by a priority queue of pending events."""
+
+    def __init__(self):
+        self._now = 0.0
+        self._events = []  # Heap of (time, order, callback, args)
+        self._order = itertools.count()  # Tie-breaker keeps same-time events FIFO
+        self._lock = threading.RLock()
+
+    def now(self):
+        """Return the current simulated time in seconds."""
+        return self._now
+
+    def schedule(self, delay, callback, *args):
+        """Schedule callback(*args) to run delay simulated seconds from now."""
+        with self._lock:
+            heapq.heappush(self._events, (self._now + delay, next(self._order), callback, args))
+
+    def schedule_at(self, event_time, callback, *args):
+        """Schedule callback(*args) to run at an absolute simulated time."""
+        with self._lock:
+            heapq.heappush(self._events, (event_time, next(self._order), callback, args))
+
+    def advance(self, delay):
+        """Advance simulated time by delay, running every event that falls due."""
+        self.run_until(self._now + delay)
+
+    def run_until(self, target_time):
+        """Run events scheduled up to target_time, then move the clock there."""
+        self._run_due(target_time)
+        with self._lock:
+            self._now = max(self._now, target_time)
+
+    def run(self):
+        """Run events until the queue is empty."""
+        self._run_due(float("inf"))
+
+    def _run_due(self, limit):
+        """Run queued events in time order until none are due at or before limit."""
+        event = self._pop_due(limit)
+        while event:
+            callback, args = event
+            # A failing event is logged and skipped, so the error neither reaches
+            # whichever caller happens to be driving the clock nor strands the
+            # events queued behind it
+            try:
+                callback(*args)
+            except Exception:
+                # The logger is looked up here rather than at import time, when the
+                # shared clock is built, so its file goes under the caller's logs directory
+                setup_logger("SimClock", "simclock").exception("Event %s failed at time %.3f", getattr(callback, "__qualname__", callback), self._now)
+            event = self._pop_due(limit)
+
+    def _pop_due(self, limit):
+        """Pop the next event due at or before limit, moving the clock to it."""
+        with self._lock:
+            if not self._events or self._events[0][0] > limit:
+                return None
+            event_time, _, callback, args = heapq.heappop(self._events)
+            self._now = max(self._now, event_time)
+            # Callbacks run outside the lock so they can schedule further events
+            return callback, args
+
+    def pending(self):
+        """Return the number of events waiting to run."""
+        return len(self._events)
+
+
+# Default clock for links and devices built outside a Network, which gives each network its own
+clock = SimClock()
@@ -0,0 +1,14 @@
+"""
+Test fixtures for the TCP/IP Network Simulator.
+"""
+
+import random
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_run(tmp_path, monkeypatch):
+    """Write component logs under a temporary directory and seed the shared random generator."""
+    (tmp_path / "logs").mkdir()
+    monkeypatch.chdir(tmp_path)
+    random.seed(0)
@@ -0,0 +1,118 @@
+"""
+Tests for the data link layer of the TCP/IP Network Simulator.
+"""
+
+from TCP_IP.network import Network
+import TCP_IP.datalink.bridge as bridge_module
+import TCP_IP.physical.device as device_module
+import TCP_IP.physical.link as link_module
+from TCP_IP.datalink.frame import Frame
+from TCP_IP.datalink.mac_address import MACAddress
+
+
+def _two_devices(monkeypatch, max_frame_size):
+    """Build two linked devices that split messages into max_frame_size chunks over an error-free link."""
+    monkeypatch.setattr(device_module, "MAX_FRAME_SIZE", max_frame_size)
+    monkeypatch.setattr(link_module, "ERROR_INJECTION_RATE", 0)
+    network = Network("DatalinkTest")
+    pc1 = network.add_device("PC1")
+    pc2 = network.add_device("PC2")
+    network.add_link("Link1", "PC1", "PC2")
+    return network, pc1, pc2
+
+
+def test_chunked_message_is_reassembled(monkeypatch):
+    network, pc1, pc2 = _two_devices(monkeypatch, 4)
+    assert pc1.send_message("The quick brown fox", pc2.mac_bytes) is True
+    assert pc2.received_messages == [("The quick brown fox", pc1.mac_str)]
+
+
+def test_out_of_order_chunks_are_buffered_until_the_gap_fills(monkeypatch):
+    network, pc1, pc2 = _two_devices(monkeypatch, 3)
+    size_frame, *chunks = pc1._create_frames("abcdefghi", pc2.mac_bytes)
+    assert [frame.data for frame in chunks] == ["abc", "def", "ghi"]
+    
+    for frame in (size_frame, chunks[2], chunks[1], chunks[1]):
+        pc2.receive_message(frame, pc1)
+    assert pc2.received_messages == []
+    
+    pc2.receive_message(chunks[0], pc1)
+    network.clock.run()
+    assert pc2.received_messages == [("abcdefghi", pc1.mac_str)]
+    assert pc2.expected_sequence_number == chunks[2].sequence_number + 1
+
+
+def test_bridge_forgets_oldest_processed_frames(monkeypatch):
+    monkeypatch.setattr(bridge_module, "PROCESSED_FRAMES_LIMIT", 2)
+    network = Network("BridgeTest")
+    bridge = network.add_bridge("B1")
+    pc1 = network.add_device("PC1")
+    
+    frames = [Frame(pc1.mac_bytes, bridge.mac_bytes, "x", seq) for seq in range(3)]
+    for frame in frames:
+        bridge.receive_message(frame, pc1)
+    assert bridge.processed_frames == {
+        (pc1.mac_bytes, bridge.mac_bytes, 1),
+        (pc1.mac_bytes, bridge.mac_bytes, 2),
+    }
+
+
+def test_corrupted_frame_fails_checksum_and_clone_keeps_original():
+    frame = Frame(b"\x01" * 6, b"\x02" * 6, "payload", 3)
+    assert frame.is_valid()
+    
+    copy = frame.clone()
+    copy.introduce_error()
+    assert not copy.is_valid()
+    assert frame.is_valid()
+    assert frame.data == "payload"
+
+
+def test_switch_tracks_vlan_of_each_port():
+    network = Network("SwitchTest")
+    switch = network.add_switch("S1")
+    switch.create_vlan(10, [0, 1])
+    switch.create_vlan(20, [2])
+    switch.add_port_to_vlan(20, 3)
+    assert switch.get_port_vlan(1) == 10
+    assert switch.get_port_vlan(3) == 20
+    
+    switch.create_vlan(10, [1])
+    switch.remove_port_from_vlan(20, 2)
+    assert switch.get_port_vlan(0) is None
+    assert switch.get_port_vlan(2) is None
+    assert switch.get_port_vlan(1) == 10
+
+
+def test_switch_moves_a_port_between_vlans():
+    network = Network("SwitchMoveTest")
+    switch = network.add_switch("S1")
+    switch.create_vlan(10, [1])
+    switch.create_vlan(20, [])
+    switch.add_port_to_vlan(20, 1)
+    assert switch.vlan_table == {10: set(), 20: {1}}
+    assert switch.get_port_vlan(1) == 20
+    
+    switch.remove_port_from_vlan(20, 1)
+    assert switch.vlan_table == {10: set(), 20: set()}
+    assert switch.get_port_vlan(1) is None
+    
+    switch.create_vlan(30, [2])
+    switch.create_vlan(10, [2, 3])
+    assert switch.vlan_table == {10: {2, 3}, 20: set(), 30: set()}
+    assert switch.get_port_vlan(2) == 10
+
+
+def test_mac_address_equality_agrees_with_hash():
+    mac = MACAddress("aa:bb:cc:dd:ee:ff")
+    assert mac == MACAddress("aa:bb:cc:dd:ee:ff") == "aa:bb:cc:dd:ee:ff"
+    assert hash(mac) == hash("aa:bb:cc:dd:ee:ff")
+    assert mac != mac.packed
+
+
+def test_send_message_rejects_malformed_target_mac(monkeypatch):
+    network, pc1, pc2 = _two_devices(monkeypatch, 8)
+    assert pc1.send_message("hi", "not-a-mac") is False
+    assert pc1.send_message("hi", "aa:bb") is False
+    assert network.clock.pending() == 0
+    assert pc1.send_message("hi", pc2.mac_address.address) is True
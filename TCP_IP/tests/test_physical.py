@@ -0,0 +1,157 @@
+"""
+Tests for the physical layer of the TCP/IP Network Simulator.
+"""
+
+import TCP_IP.physical.link as link_module
+from TCP_IP.network import Network
+from TCP_IP.physical.link import Link
+from TCP_IP.physical.scheduler import SimClock
+
+
+def _two_hosts():
+    """Build two IP-assigned devices joined by a single link."""
+    network = Network("PhysicalTest")
+    pc1 = network.add_device("PC1")
+    pc2 = network.add_device("PC2")
+    network.add_link("Link1", "PC1", "PC2")
+    pc1.assign_ip_address("10.0.0.1")
+    pc2.assign_ip_address("10.0.0.2")
+    return network, pc1, pc2
+
+
+def test_clock_runs_events_in_time_order_with_ties_fifo():
+    clock = SimClock()
+    order = []
+    clock.schedule(0.2, order.append, "late")
+    clock.schedule(0.1, order.append, "first")
+    clock.schedule(0.1, order.append, "second")
+    clock.run()
+    assert order == ["first", "second", "late"]
+    assert clock.now() == 0.2
+
+
+def test_clock_advance_runs_only_due_events():
+    clock = SimClock()
+    ran = []
+    clock.schedule(0.5, ran.append, "due")
+    clock.schedule(2.0, ran.append, "later")
+    clock.advance(1.0)
+    assert ran == ["due"]
+    assert clock.now() == 1.0
+    assert clock.pending() == 1
+    
+    clock.run()
+    assert ran == ["due", "later"]
+    assert clock.pending() == 0
+
+
+def test_clock_runs_events_scheduled_by_callbacks():
+    clock = SimClock()
+    times = []
+    
+    def tick(remaining):
+        times.append(clock.now())
+        if remaining:
+            clock.schedule(0.25, tick, remaining - 1)
+    
+    clock.schedule(0.25, tick, 2)
+    clock.run()
+    assert times == [0.25, 0.5, 0.75]
+
+
+def test_clock_schedule_at_uses_absolute_time():
+    clock = SimClock()
+    clock.advance(1.0)
+    ran = []
+    clock.schedule_at(1.5, ran.append, "absolute")
+    clock.schedule(0.2, ran.append, "relative")
+    clock.run()
+    assert ran == ["relative", "absolute"]
+    assert clock.now() == 1.5
+
+
+def test_go_back_n_retransmits_lost_frame_after_timeout(monkeypatch):
+    monkeypatch.setattr(link_module, "ERROR_INJECTION_RATE", 0)
+    network, pc1, pc2 = _two_hosts()
+    network.enable_go_back_n("PC1", window_size=4)
+    
+    # Lose the first copy of the message's only data frame on the wire
+    sent = []
+    transmit = Link.transmit
+    
+    def lossy_transmit(self, frame, source):
+        if source is pc1:
+            sent.append(frame.sequence_number)
+            if sent.count(1) == 1 and frame.sequence_number == 1:
+                return True
+        return transmit(self, frame, source)
+    
+    monkeypatch.setattr(Link, "transmit", lossy_transmit)
+    assert network.send_message("PC1", "X", "PC2") is True
+    assert sent.count(1) >= 2
+    assert [message for message, _ in pc2.received_messages] == ["X"]
+
+
+def test_send_packet_between_ip_assigned_devices():
+    network, pc1, pc2 = _two_hosts()
+    # The first send only resolves the next hop through ARP
+    assert pc1.send_packet("10.0.0.2", "hi", 6) is False
+    assert pc1.arp_table["10.0.0.2"] == pc2.mac_bytes
+    
+    assert pc1.send_packet("10.0.0.2", "hi", 6) is True
+    assert pc2.received_messages == [("hi", "10.0.0.1")]
+
+
+def test_clock_keeps_running_events_after_one_fails():
+    clock = SimClock()
+    ran = []
+    
+    def fail():
+        raise RuntimeError("boom")
+    
+    clock.schedule(0.1, fail)
+    clock.schedule(0.2, ran.append, "after")
+    clock.run()
+    assert ran == ["after"]
+    assert clock.pending() == 0
+
+
+def test_networks_run_on_separate_clocks():
+    first = Network("First")
+    first.add_device("PC1")
+    first.add_link("Link1", "PC1")
+    first.clock.schedule(5.0, lambda: None)
+    first.clock.advance(1.0)
+    
+    second = Network("Second")
+    assert second.clock is not first.clock
+    assert first.clock.now() == 1.0
+    assert first.clock.pending() == 1
+    assert first.devices["PC1"].clock is first.clock
+    assert first.links["Link1"].clock is first.clock
+
+
+def test_unattached_device_cannot_start_transmission():
+    network, pc1, pc2 = _two_hosts()
+    stranger = network.add_device("PC3")
+    link = network.links["Link1"]
+    link.medium_busy = False
+    
+    assert link.start_transmission(stranger) is False
+    assert link.start_transmission(pc2) is True
+    link.end_transmission(stranger)
+    assert link._tx_count == 1
+    assert link.detect_collision(pc2) is False
+
+
+def test_send_message_without_drain_leaves_the_clock_to_the_caller(monkeypatch):
+    monkeypatch.setattr(link_module, "ERROR_INJECTION_RATE", 0)
+    network, pc1, pc2 = _two_hosts()
+    
+    assert pc1.send_message("hello", pc2.mac_bytes, drain=False) is True
+    assert network.clock.now() == 0.0
+    assert network.clock.pending() > 0
+    assert pc2.received_messages == []
+    
+    network.clock.run()
+    assert [message for message, _ in pc2.received_messages] == ["hello"]
@@ -0,0 +1,77 @@
+"""
+Tests for the command-line interface of the TCP/IP Network Simulator.
+"""
+
+import io
+import pytest
+from TCP_IP.ui import cli
+
+
+@pytest.mark.parametrize("line", [
+    ["bogus"],
+    ["add"],
+    ["add", "device"],
+    ["demo", "nothing"],
+])
+def test_bad_command_raises_command_error(line):
+    with pytest.raises(cli.CommandError):
+        cli.PARSER.parse_args(line)
+
+
+def test_interactive_cli_reports_errors_and_keeps_going(monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin", io.StringIO("bogus command\nadd device PC1\ndisplay\nexit\n"))
+    cli.interactive_cli()
+    out = capsys.readouterr().out
+    assert "Error:" in out
+    assert "PC1 (MAC:" in out
+    assert "Exiting simulator..." in out
+
+
+@pytest.mark.parametrize("line", [
+    ["send", "packet", "PC1", "10.0.0.2", "hi", "tcp"],
+    ["enable", "gbn", "PC1", "four"],
+])
+def test_non_numeric_argument_raises_command_error(line):
+    with pytest.raises(cli.CommandError):
+        cli.PARSER.parse_args(line)
+
+
+def test_numeric_arguments_are_converted_with_defaults():
+    args = cli.PARSER.parse_args(["send", "packet", "PC1", "10.0.0.2", "hi"])
+    assert args.handler is cli._cmd_send_packet
+    assert args.protocol == 0
+    
+    args = cli.PARSER.parse_args(["enable", "gbn", "PC1", "8"])
+    assert args.window_size == 8
+
+
+def test_command_and_subcommand_words_are_case_folded(monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin", io.StringIO("ADD Device PC1\nDISPLAY\nexit\n"))
+    cli.interactive_cli()
+    assert "PC1 (MAC:" in capsys.readouterr().out
+
+
+def test_connect_interface_keyword_is_case_insensitive(monkeypatch, capsys):
+    commands = [
+        "add device PC1", "add device PC2", "add router R1", "add link L1 PC1 PC2",
+        "add link L2", "connect L2 R1 INTERFACE 10.0.0.1",
+        "connect L1 R1 Interface 10.0.1.1", "display", "exit",
+    ]
+    monkeypatch.setattr("sys.stdin", io.StringIO("\n".join(commands) + "\n"))
+    cli.interactive_cli()
+    out = capsys.readouterr().out
+    assert "Connected router R1 interface 10.0.0.1 to link L2" in out
+    # The full link is reported instead of crashing the CLI
+    assert "Error: Link already has two endpoints connected" in out
+    assert "Exiting simulator..." in out
+
+
+def test_route_commands_run_without_crashing(monkeypatch, capsys):
+    commands = [
+        "add router R1", "add link L1", "connect L1 R1 interface 10.0.0.1",
+        "add route R1 10.1.0.0/24 10.0.0.1", "add route R1 bogus 10.0.0.1",
+        "remove route R1 10.1.0.0/24", "exit",
+    ]
+    monkeypatch.setattr("sys.stdin", io.StringIO("\n".join(commands) + "\n"))
+    cli.interactive_cli()
+    assert "Exiting simulator..." in capsys.readouterr().out
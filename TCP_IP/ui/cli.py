@@ -2,300 +2,269 @@
 Command-line interface for the TCP/IP Network Simulator.
 """
 
-import time
-import threading
+import shlex
+import argparse
 import sys
 import os
+try:
+    import readline  # Line editing and history for input() at the interactive prompt
+except ImportError:
+    readline = None
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from TCP_IP.network import Network
 from TCP_IP.config import ERROR_INJECTION_RATE, CSMA_CD_SLOT_TIME, CSMA_CD_MAX_ATTEMPTS, BUSY_TIME_RANGE
-from TCP_IP.network.router import Router
 from TCP_IP.network.ip_address import IPAddress
 from TCP_IP.network.packet import Packet
 
+# Joined once at import time and written in a single call by the help command
+HELP_TEXT = "\n".join([
+    "\nAvailable commands:",
+    "  add device <name>           - Add a new device",
+    "  add hub <name>              - Add a new hub",
+    "  add bridge <name>           - Add a new bridge",
+    "  add switch <name>           - Add a new switch",
+    "  add router <name>           - Add a new router",
+    "  add link <name> [dev1] [dev2] - Add a new link between devices",
+    "  remove device <name>        - Remove a device",
+    "  remove hub <name>           - Remove a hub",
+    "  remove bridge <name>        - Remove a bridge",
+    "  remove switch <name>        - Remove a switch",
+    "  remove router <name>        - Remove a router",
+    "  remove link <name>          - Remove a link",
+    "  connect <link> <endpoint>   - Connect an endpoint to a link",
+    "  disconnect <link> <endpoint> - Disconnect an endpoint from a link",
+    "  assign ip <device> <ip_address> [subnet_mask] - Assign IP to a device",
+    "  set gateway <device> <gateway_ip> - Set default gateway for a device",
+    "  add route <router> <destination_cidr> <output_interface_ip> [next_hop_ip] - Add static route",
+    "  remove route <router> <destination_cidr> - Remove static route",
+    "  send message <source> <message> [target] - Send a Data Link message",
+    "  send packet <source> <destination_ip> <data> [protocol] - Send a Network Layer packet",
+    "  enable gbn <device> [window_size] - Enable Go-Back-N protocol",
+    "  display                     - Display network topology",
+    "  demo error                  - Demonstrate error control",
+    "  demo csmacd                 - Demonstrate CSMA/CD protocol",
+    "  help                        - Show this help message",
+    "  exit/quit                   - Exit the simulator",
+])
+
+
+class CommandError(Exception):
+    """Raised when a command line does not fit the command grammar."""
+
+
+class _CommandParser(argparse.ArgumentParser):
+    """Argument parser that reports bad input as CommandError instead of exiting."""
+    
+    def error(self, message):
+        raise CommandError(message)
+
+
+def _cmd_exit(args, network):
+    """Leave the interactive CLI."""
+    print("Exiting simulator...")
+    return True
+
+
+def _cmd_help(args, network):
+    """Print the list of available commands."""
+    print(HELP_TEXT)
+
+
+def _named(action):
+    """Build a handler that calls the Network method named action with args.name."""
+    def handler(args, network):
+        getattr(network, action)(args.name)
+    return handler
+
+
+def _cmd_add_link(args, network):
+    """Add a link, optionally connecting it to one or two endpoints."""
+    network.add_link(args.name, args.endpoint1, args.endpoint2)
+
+
+def _is_interface(args):
+    """Return True if the optional keyword after the endpoint is "interface", in any case."""
+    return args.interface is not None and args.interface.lower() == "interface"
+
+
+def _cmd_connect(args, network):
+    """Connect an endpoint (or a router interface) to a link."""
+    link = network.links.get(args.link)
+    if not link:
+        print(f"Error: Link '{args.link}' not found")
+        return
+    
+    endpoint = network.all_endpoints.get(args.endpoint)
+    if not endpoint:
+        print(f"Error: Endpoint '{args.endpoint}' not found")
+        return
+    
+    try:
+        if _is_interface(args) and args.ip_address and hasattr(endpoint, "add_interface"):
+            endpoint.add_interface(args.ip_address, args.subnet_mask, link)
+            print(f"Connected router {args.endpoint} interface {args.ip_address} to link {args.link}")
+        else:
+            link.connect_endpoint(endpoint)
+            print(f"Connected {args.endpoint} to {args.link}")
+    except ValueError as e:
+        # e.g. the link already has two endpoints
+        print(f"Error: {e}")
+
+
+def _cmd_disconnect(args, network):
+    """Disconnect an endpoint (or a router interface) from a link."""
+    link = network.links.get(args.link)
+    if not link:
+        print(f"Error: Link '{args.link}' not found")
+        return
+    
+    endpoint = network.all_endpoints.get(args.endpoint)
+    if not endpoint:
+        print(f"Error: Endpoint '{args.endpoint}' not found")
+        return
+    
+    if _is_interface(args) and hasattr(endpoint, "remove_interface"):
+        if args.ip_address:
+            endpoint.remove_interface(args.ip_address)
+            print(f"Disconnected router {args.endpoint} interface {args.ip_address} from link {args.link}")
+        else:
+            print("Error: Specify the IP address of the interface to disconnect.")
+    else:
+        link.disconnect_endpoint(endpoint)
+        print(f"Disconnected {args.endpoint} from {args.link}")
+
+
+def _cmd_assign_ip(args, network):
+    """Assign an IP address to a device."""
+    device = network.get_device(args.device)
+    if not device:
+        print(f"Error: Device '{args.device}' not found")
+        return
+    
+    if device.assign_ip_address(args.ip_address, args.subnet_mask):
+        print(f"Assigned IP {args.ip_address}/{args.subnet_mask} to {args.device}")
+    else:
+        print(f"Failed to assign IP to {args.device}")
+
+
+def _cmd_set_gateway(args, network):
+    """Set the default gateway of a device."""
+    device = network.get_device(args.device)
+    if not device:
+        print(f"Error: Device '{args.device}' not found")
+        return
+    
+    if hasattr(device, 'set_default_gateway'):
+        device.set_default_gateway(args.gateway_ip)
+        print(f"Set default gateway for {args.device} to {args.gateway_ip}")
+    else:
+        print(f"Error: Device '{args.device}' does not support setting a default gateway.")
+
+
+def _cmd_add_route(args, network):
+    """Add a static route to a router."""
+    router = network.routers.get(args.router)
+    if not router:
+        print(f"Error: Router '{args.router}' not found")
+        return
+    
+    router.add_route(args.destination_cidr, args.output_interface_ip, args.next_hop_ip)
+
+
+def _cmd_remove_route(args, network):
+    """Remove a static route from a router."""
+    router = network.routers.get(args.router)
+    if not router:
+        print(f"Error: Router '{args.router}' not found")
+        return
+    
+    router.remove_route(args.destination_cidr)
+
+
+def _cmd_send_message(args, network):
+    """Send a Data Link message."""
+    if args.target and args.target not in network.mac_by_name:
+        print(f"Error: Target device '{args.target}' not found for message send.")
+        return
+    network.send_message(args.source, args.message, args.target)
+
+
+def _cmd_send_packet(args, network):
+    """Send a Network Layer packet."""
+    network.send_packet(args.source, args.destination_ip, args.data, args.protocol)
+
+
+def _cmd_enable_gbn(args, network):
+    """Enable Go-Back-N on a device."""
+    if network.enable_go_back_n(args.device, args.window_size):
+        print(f"Enabled Go-Back-N protocol for {args.device} with window size {args.window_size}")
+    else:
+        print(f"Failed to enable Go-Back-N for {args.device}")
+
+
+def _cmd_display(args, network):
+    """Display the network topology."""
+    network.display_network()
+
+
+def _cmd_demo(args, network):
+    """Run one of the built-in demonstrations."""
+    DEMOS[args.name]()
+
+
+def _command_lines():
+    """Yield command lines: prompted from a terminal, or read straight from piped input."""
+    prompt = "\nEnter command: "
+    if sys.stdin.isatty():
+        while True:
+            try:
+                yield input(prompt)
+            except EOFError:
+                return
+    else:
+        # Scripted input is read through the buffered stream instead of one input() call per line
+        for line in sys.stdin:
+            print(prompt, end="")
+            yield line
+
+
 def interactive_cli():
     """Provide an interactive command-line interface for the network simulator."""
     network = Network("TestNetwork")
+    # Bound once so the per-line work below uses locals instead of attribute lookups
+    split = shlex.split
+    intern = sys.intern
+    parse = PARSER.parse_args
     
     print("TCP/IP Network Simulator")
     print("Type 'help' for a list of commands")
     
-    while True:
-        command = input("\nEnter command: ").strip().lower()
-        parts = command.split()
+    for line in _command_lines():
+        # Quoted arguments may contain spaces; names and messages keep their case
+        try:
+            parts = split(line)
+        except ValueError as e:
+            print(f"Error: {e}")
+            continue
         
         if not parts:
             continue
         
-        if parts[0] == "exit" or parts[0] == "quit":
-            print("Exiting simulator...")
+        # Only the command words are case-folded; names and messages keep their case.
+        # They are interned so the subparser map lookups can match the (also
+        # interned) literal names by identity instead of comparing characters
+        parts[0] = intern(parts[0].lower())
+        if len(parts) > 1 and parts[0] in SUBCOMMAND_WORDS:
+            parts[1] = intern(parts[1].lower())
+        # The whole line is parsed against the prebuilt grammar, which picks the
+        # handler; a handler returns True to leave the CLI
+        try:
+            args = parse(parts)
+        except CommandError as e:
+            print(f"Error: {e}")
+            continue
+        if args.handler(args, network):
             break
-        
-        elif parts[0] == "help":
-            print("\nAvailable commands:")
-            print("  add device <name>           - Add a new device")
-            print("  add hub <name>              - Add a new hub")
-            print("  add bridge <name>           - Add a new bridge")
-            print("  add switch <name>           - Add a new switch")
-            print("  add router <name>           - Add a new router")
-            print("  add link <name> [dev1] [dev2] - Add a new link between devices")
-            print("  remove device <name>        - Remove a device")
-            print("  remove hub <name>           - Remove a hub")
-            print("  remove bridge <name>        - Remove a bridge")
-            print("  remove switch <name>        - Remove a switch")
-            print("  remove router <name>        - Remove a router")
-            print("  remove link <name>          - Remove a link")
-            print("  connect <link> <endpoint>   - Connect an endpoint to a link")
-            print("  disconnect <link> <endpoint> - Disconnect an endpoint from a link")
-            print("  assign ip <device> <ip_address> [subnet_mask] - Assign IP to a device")
-            print("  set gateway <device> <gateway_ip> - Set default gateway for a device")
-            print("  add route <router> <destination_cidr> <output_interface_ip> [next_hop_ip] - Add static route")
-            print("  remove route <router> <destination_cidr> - Remove static route")
-            print("  send message <source> <message> [target_mac] - Send a Data Link message")
-            print("  send packet <source> <destination_ip> <data> [protocol] - Send a Network Layer packet")
-            print("  enable gbn <device> [window_size] - Enable Go-Back-N protocol")
-            print("  display                     - Display network topology")
-            print("  demo error                  - Demonstrate error control")
-            print("  demo csmacd                 - Demonstrate CSMA/CD protocol")
-            print("  help                        - Show this help message")
-            print("  exit/quit                   - Exit the simulator")
-        
-        elif parts[0] == "add":
-            if len(parts) < 3:
-                print("Error: Insufficient arguments")
-                continue
-            
-            if parts[1] == "device":
-                network.add_device(parts[2])
-            
-            elif parts[1] == "hub":
-                network.add_hub(parts[2])
-            
-            elif parts[1] == "bridge":
-                network.add_bridge(parts[2])
-            
-            elif parts[1] == "switch":
-                network.add_switch(parts[2])
-            
-            elif parts[1] == "router":
-                network.add_router(parts[2])
-            
-            elif parts[1] == "link":
-                if len(parts) == 3:
-                    network.add_link(parts[2])
-                elif len(parts) == 4:
-                    network.add_link(parts[2], parts[3])
-                elif len(parts) >= 5:
-                    network.add_link(parts[2], parts[3], parts[4])
-            
-            else:
-                print(f"Error: Unknown entity type '{parts[1]}'")
-        
-        elif parts[0] == "remove":
-            if len(parts) < 3:
-                print("Error: Insufficient arguments")
-                continue
-            
-            if parts[1] == "device":
-                network.remove_device(parts[2])
-            
-            elif parts[1] == "hub":
-                network.remove_hub(parts[2])
-            
-            elif parts[1] == "bridge":
-                network.remove_bridge(parts[2])
-            
-            elif parts[1] == "switch":
-                network.remove_switch(parts[2])
-            
-            elif parts[1] == "router":
-                network.remove_device(parts[2])
-            
-            elif parts[1] == "link":
-                network.remove_link(parts[2])
-            
-            else:
-                print(f"Error: Unknown entity type '{parts[1]}'")
-        
-        elif parts[0] == "connect":
-            if len(parts) < 3:
-                print("Error: Insufficient arguments")
-                continue
-            
-            link_name = parts[1]
-            endpoint_name = parts[2]
-            
-            link = network.links.get(link_name)
-            if not link:
-                print(f"Error: Link '{link_name}' not found")
-                continue
-            
-            endpoint = network.get_device(endpoint_name)
-            if not endpoint:
-                print(f"Error: Endpoint '{endpoint_name}' not found")
-                continue
-            
-            if isinstance(endpoint, Router) and len(parts) >= 5 and parts[3] == "interface":
-                interface_ip_str = parts[4]
-                subnet_mask_str = parts[5] if len(parts) > 5 else "255.255.255.0"
-                endpoint.add_interface(interface_ip_str, subnet_mask_str, link)
-                print(f"Connected router {endpoint_name} interface {interface_ip_str} to link {link_name}")
-            else:
-                link.connect_endpoint(endpoint)
-                print(f"Connected {endpoint_name} to {link_name}")
-        
-        elif parts[0] == "disconnect":
-            if len(parts) < 3:
-                print("Error: Insufficient arguments")
-                continue
-            
-            link_name = parts[1]
-            endpoint_name = parts[2]
-            
-            link = network.links.get(link_name)
-            if not link:
-                print(f"Error: Link '{link_name}' not found")
-                continue
-            
-            endpoint = network.get_device(endpoint_name)
-            if not endpoint:
-                print(f"Error: Endpoint '{endpoint_name}' not found")
-                continue
-            
-            if isinstance(endpoint, Router) and len(parts) >= 4 and parts[3] == "interface":
-                interface_ip_str = parts[4] if len(parts) > 4 else None
-                if interface_ip_str:
-                    endpoint.remove_interface(interface_ip_str)
-                    print(f"Disconnected router {endpoint_name} interface {interface_ip_str} from link {link_name}")
-                else:
-                    print("Error: Specify the IP address of the interface to disconnect.")
-            else:
-                link.disconnect_endpoint(endpoint)
-                print(f"Disconnected {endpoint_name} from {link_name}")
-        
-        elif parts[0] == "assign" and parts[1] == "ip":
-            if len(parts) < 4:
-                print("Error: Insufficient arguments. Usage: assign ip <device> <ip_address> [subnet_mask]")
-                continue
-            device_name = parts[2]
-            ip_address_str = parts[3]
-            subnet_mask_str = parts[4] if len(parts) > 4 else "255.255.255.0"
-            
-            device = network.get_device(device_name)
-            if not device:
-                print(f"Error: Device '{device_name}' not found")
-                continue
-            
-            if device.assign_ip_address(ip_address_str, subnet_mask_str):
-                print(f"Assigned IP {ip_address_str}/{subnet_mask_str} to {device_name}")
-            else:
-                print(f"Failed to assign IP to {device_name}")
-        
-        elif parts[0] == "set" and parts[1] == "gateway":
-            if len(parts) < 4:
-                print("Error: Insufficient arguments. Usage: set gateway <device> <gateway_ip>")
-                continue
-            device_name = parts[2]
-            gateway_ip_str = parts[3]
-            
-            device = network.get_device(device_name)
-            if not device:
-                print(f"Error: Device '{device_name}' not found")
-                continue
-            
-            if hasattr(device, 'set_default_gateway'):
-                device.set_default_gateway(gateway_ip_str)
-                print(f"Set default gateway for {device_name} to {gateway_ip_str}")
-            else:
-                print(f"Error: Device '{device_name}' does not support setting a default gateway.")
-        
-        elif parts[0] == "add" and parts[1] == "route":
-            if len(parts) < 5:
-                print("Error: Insufficient arguments. Usage: add route <router> <destination_cidr> <output_interface_ip> [next_hop_ip]")
-                continue
-            router_name = parts[2]
-            destination_cidr = parts[3]
-            output_interface_ip_str = parts[4]
-            next_hop_ip_str = parts[5] if len(parts) > 5 else None
-            
-            router = network.routers.get(router_name)
-            if not router:
-                print(f"Error: Router '{router_name}' not found")
-                continue
-            
-            router.add_route(destination_cidr, output_interface_ip_str, next_hop_ip_str)
-        
-        elif parts[0] == "remove" and parts[1] == "route":
-            if len(parts) < 4:
-                print("Error: Insufficient arguments. Usage: remove route <router> <destination_cidr>")
-                continue
-            router_name = parts[2]
-            destination_cidr = parts[3]
-            
-            router = network.routers.get(router_name)
-            if not router:
-                print(f"Error: Router '{router_name}' not found")
-                continue
-            
-            router.remove_route(destination_cidr)
-        
-        elif parts[0] == "send":
-            if len(parts) < 3:
-                print("Error: Insufficient arguments")
-                continue
-            
-            if parts[1] == "message":
-                source_name = parts[2]
-                message = parts[3]
-                target_name = parts[4] if len(parts) > 4 else None
-                target_mac = None
-                if target_name:
-                    target_device = network.get_device(target_name)
-                    if target_device:
-                        target_mac = str(target_device.mac_address)
-                    else:
-                        print(f"Error: Target device '{target_name}' not found for message send.")
-                        continue
-                network.send_message(source_name, message, target_mac)
-            
-            elif parts[1] == "packet":
-                if len(parts) < 4:
-                    print("Error: Insufficient arguments. Usage: send packet <source> <destination_ip> <data> [protocol]")
-                    continue
-                source_name = parts[2]
-                destination_ip_str = parts[3]
-                data = parts[4]
-                protocol = int(parts[5]) if len(parts) > 5 else 0
-                
-                network.send_packet(source_name, destination_ip_str, data, protocol)
-            
-            else:
-                print(f"Error: Unknown send type '{parts[1]}'")
-        
-        elif parts[0] == "enable" and parts[1] == "gbn":
-            if len(parts) < 3:
-                print("Error: Insufficient arguments")
-                continue
-            
-            device_name = parts[2]
-            window_size = int(parts[3]) if len(parts) > 3 else 4
-            
-            if network.enable_go_back_n(device_name, window_size):
-                print(f"Enabled Go-Back-N protocol for {device_name} with window size {window_size}")
-            else:
-                print(f"Failed to enable Go-Back-N for {device_name}")
-        
-        elif parts[0] == "display":
-            network.display_network()
-        
-        elif parts[0] == "demo" and parts[1] == "error":
-            demonstrate_error_control()
-        
-        elif parts[0] == "demo" and parts[1] == "csmacd":
-            demonstrate_csma_cd()
-        
-        else:
-            print(f"Error: Unknown command '{command}'")
 
 
 def demonstrate_error_control(network=None):
@@ -322,15 +291,13 @@ def demonstrate_error_control(network=None):
     # Send a message from PC1 to PC2
     print("\nSending message from PC1 to PC2 with error control...")
     print(f"Error injection rate: {ERROR_INJECTION_RATE*100}%")
+    # send_message runs the simulation clock until every frame and ACK has arrived
     network.send_message("PC1", "This is a test message with error control!", "PC2")
     
-    # Wait a bit for message processing to complete
-    time.sleep(2)
-    
-    # Display received messages
-    print("\nMessages received by PC2:")
-    for data, source in network.devices["PC2"].received_messages:
-        print(f"  '{data}' from {source}")
+    # Display received messages, gathered into one write
+    lines = ["\nMessages received by PC2:\n"]
+    lines.extend(f"  '{data}' from {source}\n" for data, source in network.devices["PC2"].received_messages)
+    sys.stdout.write("".join(lines))
     
     return network
 
@@ -369,51 +336,109 @@ def demonstrate_csma_cd(network=None):
     print("This will demonstrate how devices detect collisions and use backoff algorithms")
     print("Watch the logs to see the CSMA/CD protocol in action")
     
-    # Define a function to send messages with a delay
-    def delayed_send(delay, source, message, target):
-        print(f"Scheduling {source} to send message in {delay:.2f} seconds")
-        time.sleep(delay)
-        print(f"{source} attempting to send: '{message}'")
-        network.send_message(source, message, target)
+    # Define a function to send a message once its scheduled time comes
+    def delayed_send(source, message, target_mac):
+        print(f"{source.name} attempting to send: '{message}'")
+        # The demo's single clock.run() below delivers the frames, so only queue them here
+        source.send_message(message, target_mac, drain=False)
     
     # Start multiple transmissions with overlapping timing to create collision scenarios
-    threads = []
+    schedule = [
+        (0.1, "PC1", "Message from PC1", "PC3"),  # First transmission
+        (0.15, "PC2", "Message from PC2", "PC4"),  # Second transmission (likely to collide with first)
+        (1.0, "PC4", "Message from PC4", "PC1"),  # Third transmission (after a delay, may avoid collision)
+        (2.0, "PC3", "Message from PC3", "PC2"),  # Fourth transmission (even later, should avoid collision)
+    ]
     
-    # First transmission
-    t1 = threading.Thread(target=delayed_send, args=(0.1, "PC1", "Message from PC1", "PC3"))
-    threads.append(t1)
-    
-    # Second transmission (likely to collide with first)
-    t2 = threading.Thread(target=delayed_send, args=(0.15, "PC2", "Message from PC2", "PC4"))
-    threads.append(t2)
+    # Every send is queued on the simulation clock before any of them runs, and
+    # one run drains them all, so transmissions that overlap in simulated time
+    # contend for the hub's links instead of each finishing before the next starts.
+    # Sources and targets are resolved here once, through the network's name
+    # maps, so each send goes straight to the device with the target's MAC
+    for delay, source, message, target in schedule:
+        print(f"Scheduling {source} to send message in {delay:.2f} seconds")
+        network.clock.schedule(delay, delayed_send, network.devices[source], message, network.mac_by_name[target])
+    network.clock.run()
     
-    # Third transmission (after a delay, may avoid collision)
-    t3 = threading.Thread(target=delayed_send, args=(1.0, "PC4", "Message from PC4", "PC1"))
-    threads.append(t3)
+    # Display received messages, gathered into one write
+    lines = ["\nMessages received by devices:\n"]
+    for name, device in network.devices.items():
+        lines.append(f"{name} received messages:\n")
+        lines.extend(f"  '{data}' from {source}\n" for data, source in device.received_messages)
+    sys.stdout.write("".join(lines))
     
-    # Fourth transmission (even later, should avoid collision)
-    t4 = threading.Thread(target=delayed_send, args=(2.0, "PC3", "Message from PC3", "PC2"))
-    threads.append(t4)
+    print("\nCSMA/CD Demonstration Complete")
+    print("Check the logs for detailed information about carrier sensing, collisions, and backoff")
     
-    # Start all threads
-    for t in threads:
-        t.start()
+    return network
+
+
+# Demo name -> function run by "demo <name>"
+DEMOS = {
+    "error": demonstrate_error_control,
+    "csmacd": demonstrate_csma_cd,
+}
+
+
+def _build_parser():
+    """Build the command grammar that every CLI line is parsed against."""
+    # Positional arguments only, with no -h/--help either, so argparse never
+    # takes its slow optional-argument scan
+    parser = _CommandParser(prog="", add_help=False)
+    commands = parser.add_subparsers(dest="command", required=True)
     
-    # Wait for all threads to complete
-    for t in threads:
-        t.join()
+    def command(subparsers, name, handler, *arguments, **kwargs):
+        """Add a command taking the given positional arguments, each a name or (name, default)."""
+        command_parser = subparsers.add_parser(name, add_help=False, **kwargs)
+        for argument in arguments:
+            if isinstance(argument, tuple):
+                command_parser.add_argument(argument[0], nargs="?", default=argument[1])
+            else:
+                command_parser.add_argument(argument)
+        command_parser.set_defaults(handler=handler)
+        return command_parser
     
-    # Wait a bit more to ensure all transmissions complete
-    time.sleep(2)
+    command(commands, "exit", _cmd_exit, aliases=["quit"])
+    command(commands, "help", _cmd_help)
+    command(commands, "display", _cmd_display)
+    command(commands, "connect", _cmd_connect,
+            "link", "endpoint", ("interface", None), ("ip_address", None), ("subnet_mask", "255.255.255.0"))
+    command(commands, "disconnect", _cmd_disconnect,
+            "link", "endpoint", ("interface", None), ("ip_address", None))
     
-    # Display received messages
-    print("\nMessages received by devices:")
-    for name, device in network.devices.items():
-        print(f"{name} received messages:")
-        for data, source in device.received_messages:
-            print(f"  '{data}' from {source}")
+    add = commands.add_parser("add", add_help=False).add_subparsers(dest="entity", required=True)
+    remove = commands.add_parser("remove", add_help=False).add_subparsers(dest="entity", required=True)
+    for entity in ("device", "hub", "bridge", "switch", "router"):
+        command(add, entity, _named(f"add_{entity}"), "name")
+    # Routers are removed along with the other devices
+    for entity in ("device", "hub", "bridge", "switch"):
+        command(remove, entity, _named(f"remove_{entity}"), "name")
+    command(remove, "router", _named("remove_device"), "name")
+    command(add, "link", _cmd_add_link, "name", ("endpoint1", None), ("endpoint2", None))
+    command(remove, "link", _named("remove_link"), "name")
+    command(add, "route", _cmd_add_route, "router", "destination_cidr", "output_interface_ip", ("next_hop_ip", None))
+    command(remove, "route", _cmd_remove_route, "router", "destination_cidr")
     
-    print("\nCSMA/CD Demonstration Complete")
-    print("Check the logs for detailed information about carrier sensing, collisions, and backoff")
+    assign = commands.add_parser("assign", add_help=False).add_subparsers(dest="setting", required=True)
+    command(assign, "ip", _cmd_assign_ip, "device", "ip_address", ("subnet_mask", "255.255.255.0"))
+    set_ = commands.add_parser("set", add_help=False).add_subparsers(dest="setting", required=True)
+    command(set_, "gateway", _cmd_set_gateway, "device", "gateway_ip")
+    send = commands.add_parser("send", add_help=False).add_subparsers(dest="kind", required=True)
+    command(send, "message", _cmd_send_message, "source", "message", ("target", None))
+    # Numeric arguments are converted by the parser, so bad values are reported like any other parse error
+    command(send, "packet", _cmd_send_packet, "source", "destination_ip", "data").add_argument(
+        "protocol", nargs="?", type=int, default=0)
+    enable = commands.add_parser("enable", add_help=False).add_subparsers(dest="protocol", required=True)
+    command(enable, "gbn", _cmd_enable_gbn, "device").add_argument("window_size", nargs="?", type=int, default=4)
     
-    return network
+    demo = commands.add_parser("demo", add_help=False)
+    demo.add_argument("name", choices=DEMOS)
+    demo.set_defaults(handler=_cmd_demo)
+    return parser
+
+
+# Built once at import time and reused for every command line
+PARSER = _build_parser()
+
+# Commands whose second word names a subcommand ("add device") rather than an argument
+SUBCOMMAND_WORDS = frozenset(("add", "remove", "assign", "set", "send", "enable", "demo"))
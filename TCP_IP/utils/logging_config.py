@@ -1,25 +1,75 @@
 """
 Logging configuration for the TCP/IP Network Simulator.
+
+Log calls pass their arguments %-style (logger.info("Sending %s", frame)) so
+records filtered out by level are never formatted.
 """
 
+import atexit
+import functools
 import logging
+import logging.handlers
 import os
-
-# Create logs directory if it doesn't exist
-if not os.path.exists('logs'):
-    os.makedirs('logs')
+import queue
 
 # Setup logging configuration
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
+class _ComponentFiles(logging.Handler):
+    """Write each record to the log files registered for the logger that made it"""
+
+    def __init__(self):
+        super().__init__()
+        self.files = {}  # Logger name -> {path: FileHandler}
+
+    def emit(self, record):
+        for file_handler in self.files.get(record.name, {}).values():
+            file_handler.handle(record)
+
+# Components only put their records on this queue; one listener thread does all
+# the file writes, so logging on the transmit path never waits on disk I/O
+_log_queue = queue.SimpleQueue()
+_component_files = _ComponentFiles()
+_listener = logging.handlers.QueueListener(_log_queue, _component_files)
+_listener_started = False
+
+def _start_listener():
+    """Start the file-writing thread on first use and drain it at exit"""
+    global _listener_started
+    if not _listener_started:
+        _listener.start()
+        # Runs before logging's own exit hook, which then closes the files
+        atexit.register(_listener.stop)
+        _listener_started = True
+
+# A component created again (e.g. a second demo network) gets its configured
+# logger back without redoing the path and handler checks
+@functools.lru_cache(maxsize=None)
 def setup_logger(name, log_file=None):
     """Setup a logger for a component"""
     logger = logging.getLogger(name)
-    
+    # Set on the logger itself so disabled levels are rejected before a record is built
+    logger.setLevel(logging.INFO)
+
     if log_file:
-        file_handler = logging.FileHandler(f"logs/{log_file}.log")
-        file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-        logger.addHandler(file_handler)
-    
-    return logger 
\ No newline at end of file
+        # Loggers are shared by name, so a call that misses the cache (e.g. with
+        # log_file passed by keyword) still reuses the file handler rather than adding another
+        path = os.path.abspath(f"logs/{log_file}.log")
+        files = _component_files.files.get(name, {})
+        if path not in files:
+            # Create the logs directory on first use; exist_ok makes this safe to repeat
+            os.makedirs('logs', exist_ok=True)
+            # delay=True opens the file on the first record written to it, so a
+            # component that never logs to its file holds no file descriptor
+            file_handler = logging.FileHandler(path, delay=True)
+            file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+            # Swap in a new dict so the listener thread never sees one being changed
+            _component_files.files[name] = {**files, path: file_handler}
+        if not any(isinstance(h, logging.handlers.QueueHandler) for h in logger.handlers):
+            logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+            _start_listener()
+        # Records already go to the component's file; don't write them again through the root handler
+        logger.propagate = False
+
+    return logger
@@ -0,0 +1,46 @@
+"""
+Reader/writer lock for the TCP/IP Network Simulator.
+"""
+
+import threading
+from contextlib import contextmanager
+
+class RWLock:
+    """Lock that lets many readers in at once but gives writers exclusive access."""
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0  # Readers currently inside
+        self._writer = False  # Whether a writer is currently inside
+        self._writers_waiting = 0  # Waiting writers block new readers so they can't starve
+
+    @contextmanager
+    def reader(self):
+        """Hold the lock for reading; other readers may hold it at the same time."""
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def writer(self):
+        """Hold the lock exclusively."""
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()